@@ -0,0 +1,11 @@
+import os
+from django.core.asgi import get_asgi_application
+
+# Set the default settings module for the 'asgi' command-line utility
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'addressbook.settings')
+# Lets settings drop sync-only middleware that would pin a thread per request
+os.environ.setdefault('DJANGO_SERVER_MODE', 'asgi')
+
+# Get the ASGI application callable for use by any ASGI server
+# (e.g. gunicorn -k uvicorn.workers.UvicornWorker addressbook.asgi:application)
+application = get_asgi_application()
@@ -0,0 +1,37 @@
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.base import IsolationLevel
+
+from .pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL backend that checks connections out of a per-process pool
+    (see pool.ConnectionPool) instead of opening one per thread, and
+    returns them to the pool when Django closes the connection.
+
+    Pool options come from the POOL key of the database settings; use it
+    with CONN_MAX_AGE = 0 so connections go back at the end of each
+    request.
+    """
+    pool = None
+
+    def get_pool(self, conn_params):
+        return get_pool(self.alias, self.settings_dict.get('POOL', {}), conn_params)
+
+    def get_new_connection(self, conn_params):
+        # Remembered so the connection goes back to the pool it came from
+        self.pool = self.get_pool(conn_params)
+        connection = self.pool.getconn(
+            lambda: super(DatabaseWrapper, self).get_new_connection(conn_params)
+        )
+        # get_new_connection() normally sets this; reused connections skip it
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.putconn(self.connection)
@@ -0,0 +1,217 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+
+from addressbook.instrumentation import current_metrics
+
+logger = logging.getLogger('addressbook.db.pool')
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """No connection became available within the pool timeout"""
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of psycopg2 connections for one database
+    alias in one process.
+
+    The bound is per process: a deployment opens up to processes x
+    ``max_size`` server connections in total. To cap them across processes
+    and hosts, point the database settings at PgBouncer (see DATABASE_POOL
+    in settings).
+
+    At most ``max_size`` connections are open; callers wait up to
+    ``timeout`` seconds for one to be returned. Idle connections are
+    checked with ``SELECT 1`` when they have been idle longer than
+    ``health_check_interval``, closed after ``max_idle`` seconds idle
+    (keeping ``min_size``) and retired after ``max_lifetime``.
+    """
+    def __init__(self, min_size=1, max_size=10, timeout=10, max_idle=300,
+                 max_lifetime=3600, health_check_interval=30):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+
+        self._idle = []  # (connection, created_at, returned_at), most recent last
+        self._created = {}  # id(connection) -> created_at, for checked-out connections
+        self._size = 0
+        self._cond = threading.Condition()
+        self._counters = {
+            'checkouts': 0, 'waits': 0, 'wait_time': 0.0, 'max_wait': 0.0,
+            'timeouts': 0, 'connections_created': 0, 'connections_closed': 0,
+            'health_check_failures': 0,
+        }
+
+    def stats(self):
+        with self._cond:
+            return {
+                **self._counters,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'max_size': self.max_size,
+            }
+
+    def getconn(self, connect):
+        """Check out a connection, opening one with ``connect()`` if allowed"""
+        started = time.monotonic()
+        while True:
+            entry = self._acquire(started)
+            if entry is None:
+                break
+            connection, created_at, returned_at = entry
+            if self._healthy(connection, returned_at):
+                with self._cond:
+                    self._created[id(connection)] = created_at
+                return connection
+            self._discard(connection)
+
+        try:
+            connection = connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created[id(connection)] = time.monotonic()
+            self._counters['connections_created'] += 1
+        return connection
+
+    def putconn(self, connection):
+        """Return a checked-out connection, or close it if it is unusable"""
+        now = time.monotonic()
+        with self._cond:
+            created_at = self._created.pop(id(connection), now)
+        if now - created_at > self.max_lifetime or not self._reset(connection):
+            self._discard(connection)
+            return
+        with self._cond:
+            self._idle.append((connection, created_at, now))
+            self._cond.notify()
+
+    def _acquire(self, started):
+        """Return an idle entry, or None once a new connection may be opened"""
+        deadline = started + self.timeout
+        with self._cond:
+            self._prune()
+            while not self._idle and self._size >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters['timeouts'] += 1
+                    raise PoolTimeout(
+                        f"No database connection available within {self.timeout}s "
+                        f"(pool size {self.max_size})"
+                    )
+                self._cond.wait(remaining)
+
+            waited = time.monotonic() - started
+            self._counters['checkouts'] += 1
+            if waited > 0.001:
+                self._counters['waits'] += 1
+                self._counters['wait_time'] += waited
+                self._counters['max_wait'] = max(self._counters['max_wait'], waited)
+                metrics = current_metrics()
+                if metrics is not None:
+                    metrics.add_phase('pool_wait', waited)
+
+            if self._idle:
+                return self._idle.pop()
+            self._size += 1
+            return None
+
+    def _prune(self):
+        # Called with the lock held; idle entries are oldest first
+        now = time.monotonic()
+        while len(self._idle) > self.min_size and now - self._idle[0][2] > self.max_idle:
+            connection, _, _ = self._idle.pop(0)
+            self._close(connection)
+            self._size -= 1
+
+    def _healthy(self, connection, returned_at):
+        if connection.closed:
+            return False
+        if time.monotonic() - returned_at < self.health_check_interval:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if not connection.autocommit:
+                connection.rollback()
+            return True
+        except psycopg2.Error:
+            with self._cond:
+                self._counters['health_check_failures'] += 1
+            return False
+
+    def _reset(self, connection):
+        """Roll back any open transaction; False if the connection is unusable"""
+        if connection.closed:
+            return False
+        status = connection.get_transaction_status()
+        if status == extensions.TRANSACTION_STATUS_IDLE:
+            return True
+        if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        try:
+            connection.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, connection):
+        self._close(connection)
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except psycopg2.Error:
+            logger.warning("Error closing pooled connection", exc_info=True)
+        self._counters['connections_closed'] += 1
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _params_key(conn_params):
+    # A digest rather than the parameters themselves, which hold the password
+    return hashlib.sha256(repr(sorted(conn_params.items())).encode('utf-8')).hexdigest()
+
+
+def get_pool(alias, options, conn_params):
+    """
+    Return this process's pool for ``alias`` and ``conn_params``, creating
+    it on first use.
+
+    The connection parameters are part of the key so that a changed
+    database (the test runner's test database, a settings override) never
+    gets connections opened for the previous one.
+    """
+    # Forked workers must not share sockets
+    key = (os.getpid(), alias, _params_key(conn_params))
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(**options)
+    return pool
+
+
+def pool_stats():
+    """Return {alias: stats} for the pools of the current process, the newest per alias"""
+    pid = os.getpid()
+    return {alias: pool.stats() for (owner, alias, _), pool in list(_pools.items()) if owner == pid}
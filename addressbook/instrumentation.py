@@ -0,0 +1,85 @@
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar('request_metrics', default=None)
+
+_IN_LIST = re.compile(r'\((?:%s, )+%s\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def sql_shape(sql):
+    """Normalize SQL so that queries differing only in IN-list length match"""
+    return _WHITESPACE.sub(' ', _IN_LIST.sub('(%s, ...)', sql)).strip()
+
+
+class RequestMetrics:
+    """
+    Query and timing figures for one request.
+
+    Installed as a database execute wrapper by
+    RequestInstrumentationMiddleware; code that wants its own phase in the
+    Server-Timing header wraps it in ``timed(name)``.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.shapes = Counter()
+        self.phases = {}
+        self._active = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_time += time.perf_counter() - started
+            self.shapes[sql_shape(sql)] += 1
+
+    def add_phase(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0) + seconds
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+    def repeated_queries(self, threshold):
+        """Return [(shape, count)] for SQL shapes run at least ``threshold`` times"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+def current_metrics():
+    """Return the RequestMetrics of the request being handled, if any"""
+    return _current.get()
+
+
+def activate(metrics):
+    return _current.set(metrics)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+@contextmanager
+def timed(phase):
+    """
+    Add the time spent in the block to ``phase`` of the current request.
+
+    Nested blocks for the same phase are only counted once.
+    """
+    metrics = _current.get()
+    if metrics is None or phase in metrics._active:
+        yield
+        return
+    metrics._active.add(phase)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics._active.discard(phase)
+        metrics.add_phase(phase, time.perf_counter() - started)
@@ -0,0 +1,144 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+from .instrumentation import RequestMetrics, activate, deactivate
+
+logger = logging.getLogger('addressbook.requests')
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised for views over their query budget when INSTRUMENTATION['STRICT_BUDGETS'] is on"""
+
+
+def get_query_budget(view_func, request):
+    """
+    Return the query budget declared by the view, or None.
+
+    Views declare ``query_budget`` as an int, or as a dict keyed by
+    viewset action (or lower-case HTTP method for plain views).
+    """
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    budget = getattr(view_class or view_func, 'query_budget', None)
+    if isinstance(budget, dict):
+        method = request.method.lower()
+        actions = getattr(view_func, 'actions', None) or {}
+        budget = budget.get(actions.get(method, method))
+    return budget
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Record query count, SQL time, serialization/render time and total
+    time for each request.
+
+    Logs slow requests and repeated identical SQL shapes (N+1 suspects),
+    checks the view's ``query_budget``, and emits Server-Timing and
+    X-Query-Count headers in DEBUG, with INSTRUMENTATION['EXPOSE_HEADERS'],
+    or to staff users.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = settings.INSTRUMENTATION
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.config['ENABLED']:
+            return self.get_response(request)
+
+        metrics, token, stack = self._start(request)
+        try:
+            with stack:
+                response = self.get_response(request)
+        finally:
+            deactivate(token)
+        self._report(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        if not self.config['ENABLED']:
+            return await self.get_response(request)
+
+        metrics, token, stack = self._start(request)
+        try:
+            with stack:
+                response = await self.get_response(request)
+        finally:
+            deactivate(token)
+        self._report(request, response, metrics)
+        return response
+
+    def _start(self, request):
+        metrics = RequestMetrics()
+        request.metrics = metrics
+        token = activate(metrics)
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics))
+        return metrics, token, stack
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_query_budget(view_func, request)
+
+    def process_template_response(self, request, response):
+        metrics = getattr(request, 'metrics', None)
+        if metrics is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: metrics.add_phase('render', time.perf_counter() - started)
+            )
+        return response
+
+    def _expose_headers(self, request):
+        # Query counts and timings describe the backend, so they are only
+        # sent in development, when EXPOSE_HEADERS is on, or to staff
+        if settings.DEBUG or self.config['EXPOSE_HEADERS']:
+            return True
+        user = getattr(request, 'user', None)
+        return bool(user is not None and user.is_staff)
+
+    def _report(self, request, response, metrics):
+        total = metrics.total_time
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else request.path
+        budget = getattr(request, 'query_budget', None)
+
+        if self._expose_headers(request):
+            response['X-Query-Count'] = str(metrics.queries)
+            if budget is not None:
+                response['X-Query-Budget'] = str(budget)
+            if self.config['SERVER_TIMING']:
+                timings = [f'db;dur={metrics.sql_time * 1000:.1f};desc="{metrics.queries} queries"']
+                timings += [f'{name};dur={seconds * 1000:.1f}' for name, seconds in metrics.phases.items()]
+                timings.append(f'total;dur={total * 1000:.1f}')
+                response['Server-Timing'] = ', '.join(timings)
+
+        for shape, count in metrics.repeated_queries(self.config['N_PLUS_ONE_THRESHOLD']):
+            logger.warning(
+                "Possible N+1 in %s %s (%s): %d x %s",
+                request.method, request.path, view_name, count, shape
+            )
+        if total * 1000 >= self.config['SLOW_REQUEST_MS']:
+            logger.warning(
+                "Slow request %s %s (%s): %.0f ms, %d queries in %.0f ms",
+                request.method, request.path, view_name,
+                total * 1000, metrics.queries, metrics.sql_time * 1000
+            )
+        if budget is not None and metrics.queries > budget:
+            message = (
+                f"{request.method} {request.path} ({view_name}) ran "
+                f"{metrics.queries} queries, over its budget of {budget}"
+            )
+            if self.config['STRICT_BUDGETS']:
+                raise QueryBudgetExceeded(message)
+            logger.error(message)
@@ -0,0 +1,212 @@
+import hashlib
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger('addressbook.db.replicas')
+
+# Set while a view marked with @replica_reads runs: {'alias': ..., 'wrote': bool}
+_state = ContextVar('replica_reads', default=None)
+
+STICKY_COOKIE = 'db_primary_until'
+
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+class ReplicaHealth:
+    """
+    Per-process view of replica health, refreshed at most every
+    REPLICA_ROUTING['HEALTH_CHECK_INTERVAL'] seconds per alias.
+    """
+    def __init__(self):
+        self._checked = {}  # alias -> (checked_at, lag or None if unreachable)
+        self._lock = threading.Lock()
+
+    def lag(self, alias):
+        interval = settings.REPLICA_ROUTING['HEALTH_CHECK_INTERVAL']
+        checked = self._checked.get(alias)
+        if checked is None or time.monotonic() - checked[0] > interval:
+            with self._lock:
+                checked = self._checked.get(alias)
+                if checked is None or time.monotonic() - checked[0] > interval:
+                    checked = self._checked[alias] = (time.monotonic(), self._measure(alias))
+        return checked[1]
+
+    def _measure(self, alias):
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(LAG_SQL)
+                return float(cursor.fetchone()[0])
+        except Exception:
+            logger.warning("Replica %s is unreachable", alias, exc_info=True)
+            try:
+                connections[alias].close()
+            except Exception:
+                pass
+            return None
+
+    def usable(self, alias):
+        lag = self.lag(alias)
+        return lag is not None and lag <= settings.REPLICA_ROUTING['MAX_LAG_SECONDS']
+
+
+health = ReplicaHealth()
+
+
+def pick_replica():
+    """Return a healthy replica alias, or None to use the primary"""
+    aliases = [alias for alias in settings.REPLICA_ROUTING['ALIASES'] if health.usable(alias)]
+    return random.choice(aliases) if aliases else None
+
+
+def _client_key(request):
+    # Token clients rarely keep cookies, so they are tracked by credential
+    authorization = request.META.get('HTTP_AUTHORIZATION')
+    if authorization:
+        return 'db:sticky:' + hashlib.sha256(authorization.encode('utf-8')).hexdigest()
+    return None
+
+
+def _sticky_cache():
+    return caches[settings.REPLICA_ROUTING['CACHE_ALIAS']]
+
+
+def is_sticky(request):
+    """True while the client is inside its read-your-writes window"""
+    try:
+        if float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+    key = _client_key(request)
+    return key is not None and bool(_sticky_cache().get(key))
+
+
+def _routable(request):
+    return bool(
+        settings.REPLICA_ROUTING['ALIASES']
+        and request.method in ('GET', 'HEAD')
+        and not is_sticky(request)
+    )
+
+
+def replica_reads(view):
+    """
+    Route the ORM reads of a view to a healthy replica.
+
+    Only GET/HEAD requests from clients outside their sticky window are
+    routed; anything the view writes goes to the primary, and its later
+    reads follow. Works on async views too: the routing state is a context
+    variable, which sync_to_async carries into the ORM calls.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapped(request, *args, **kwargs):
+            if not await sync_to_async(_routable)(request):
+                return await view(request, *args, **kwargs)
+            token = _state.set({'alias': await sync_to_async(pick_replica)(), 'wrote': False})
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _state.reset(token)
+        return async_wrapped
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if not _routable(request):
+            return view(request, *args, **kwargs)
+        token = _state.set({'alias': pick_replica(), 'wrote': False})
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _state.reset(token)
+    return wrapped
+
+
+def reads_may_be_stale():
+    """
+    True when the current view reads from a replica that may not have
+    caught up with the latest contact write yet; shared caches should not
+    be filled from such reads.
+    """
+    state = _state.get()
+    if not state or not state['alias'] or state['wrote']:
+        return False
+    from contacts.cache import get_contacts_changed_at
+
+    changed_at = get_contacts_changed_at()
+    if changed_at is None:
+        # No write since the cache was last flushed, or the marker was
+        # evicted; treating every read as stale would disable caching
+        # until the next write
+        return False
+    return time.time() - changed_at.timestamp() < settings.REPLICA_ROUTING['MAX_LAG_SECONDS']
+
+
+class ReplicaRouter:
+    """
+    Send reads made inside @replica_reads views to a replica; everything
+    else, including all writes and migrations, stays on the primary.
+    """
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state and state['alias'] and not state['wrote']:
+            return state['alias']
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state:
+            state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_ROUTING['ALIASES']}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.REPLICA_ROUTING['ALIASES']:
+            return False
+        return None
+
+
+class ReplicaStickinessMiddleware(MiddlewareMixin):
+    """
+    After a successful write request, pin the client's reads to the
+    primary for REPLICA_ROUTING['STICKY_SECONDS'] (cookie for browsers,
+    cache entry keyed by the Authorization header for API clients).
+    """
+    def process_response(self, request, response):
+        if (
+            settings.REPLICA_ROUTING['ALIASES']
+            and request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+            and response.status_code < 400
+        ):
+            seconds = settings.REPLICA_ROUTING['STICKY_SECONDS']
+            response.set_cookie(
+                STICKY_COOKIE, str(time.time() + seconds),
+                max_age=seconds, httponly=True, samesite='Lax',
+                secure=request.is_secure()
+            )
+            key = _client_key(request)
+            if key is not None:
+                _sticky_cache().set(key, True, seconds)
+        return response
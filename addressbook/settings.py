@@ -33,14 +33,23 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'addressbook.middleware.RequestInstrumentationMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'addressbook.routers.ReplicaStickinessMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# 'asgi' when served through addressbook/asgi.py. WhiteNoise is sync-only
+# and would hold a thread for every request there, so static files are
+# left to nginx in that deployment.
+SERVER_MODE = os.getenv('DJANGO_SERVER_MODE', 'wsgi')
+if SERVER_MODE == 'asgi':
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
+
 ROOT_URLCONF = 'addressbook.urls'
 
 TEMPLATES = [
@@ -86,6 +95,60 @@ except ImportError:
         }
     }
 
+# Read replicas: DB_REPLICA_URLS is a comma-separated list of database URLs,
+# exposed as aliases replica_1, replica_2, ... Views marked with
+# addressbook.routers.replica_reads read from a healthy replica whose lag
+# is under MAX_LAG_SECONDS; a client that just wrote reads from the primary
+# for STICKY_SECONDS. Point a URL at the primary itself to try it locally.
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv('DB_REPLICA_URLS', '').split(',') if url.strip()]
+if DATABASE_REPLICA_URLS:
+    import dj_database_url
+    for index, url in enumerate(DATABASE_REPLICA_URLS, start=1):
+        DATABASES[f'replica_{index}'] = dj_database_url.parse(
+            url, conn_max_age=600, conn_health_checks=True
+        )
+        DATABASES[f'replica_{index}']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['addressbook.routers.ReplicaRouter']
+
+REPLICA_ROUTING = {
+    'ALIASES': [f'replica_{index}' for index in range(1, len(DATABASE_REPLICA_URLS) + 1)],
+    'STICKY_SECONDS': int(os.getenv('DB_REPLICA_STICKY_SECONDS', 10)),
+    'MAX_LAG_SECONDS': float(os.getenv('DB_REPLICA_MAX_LAG_SECONDS', 5)),
+    'HEALTH_CHECK_INTERVAL': float(os.getenv('DB_REPLICA_HEALTH_CHECK_INTERVAL', 5)),
+    'CACHE_ALIAS': 'default',
+}
+
+# Optional connection pooling (addressbook.db.backends.pooled_postgresql).
+# MAX_SIZE bounds the connections each gunicorn worker process opens, so
+# Postgres backends stay at workers x MAX_SIZE however many threads run;
+# TIMEOUT is how long a request waits for a free connection. The pool does
+# not cap connections across processes or hosts: keep the sum of
+# workers x MAX_SIZE over every web, ASGI and worker process below
+# max_connections, or set DB_HOST/DB_PORT to a PgBouncer, whose
+# max_db_connections enforces one limit for all of them (session pooling
+# mode keeps the exports' server-side cursors working).
+DATABASE_POOL = {
+    'ENABLED': os.getenv('DB_POOL_ENABLED', 'False') == 'True',
+    'MIN_SIZE': int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+    'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+    'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+    'MAX_IDLE': float(os.getenv('DB_POOL_MAX_IDLE', 300)),
+    'MAX_LIFETIME': float(os.getenv('DB_POOL_MAX_LIFETIME', 3600)),
+    'HEALTH_CHECK_INTERVAL': float(os.getenv('DB_POOL_HEALTH_CHECK_INTERVAL', 30)),
+}
+if DATABASE_POOL['ENABLED']:
+    for database in DATABASES.values():
+        database.update({
+            'ENGINE': 'addressbook.db.backends.pooled_postgresql',
+            # Hand connections back to the pool at the end of every request
+            'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': False,
+            'POOL': {
+                key.lower(): value for key, value in DATABASE_POOL.items() if key != 'ENABLED'
+            },
+        })
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -117,7 +180,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -137,10 +200,124 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/day',
-        'user': '1000/day'
+        'user': '1000/day',
+        # /api/contacts/lookup/ is called per inbound call by integrations
+        'contact_lookup': os.getenv('CONTACT_LOOKUP_RATE', '50/second'),
+        # Typeahead, including the linked clients picker on the contact form
+        'contact_suggest': os.getenv('CONTACT_SUGGEST_RATE', '10/second'),
     }
 }
 
+# Cache: Redis when REDIS_URL is set (docker-compose), otherwise a local
+# in-memory cache, which is also what tests run against.
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'addressbook',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'addressbook',
+        }
+    }
+
+# Contact search: 'trigram' (substring + fuzzy), 'fulltext' (search_vector)
+# or 'icontains' (unindexed baseline). Can be overridden per request with
+# ?backend=<name>. Ranked result ids are cached per normalized query and
+# invalidated whenever a contact or its links change.
+CONTACT_SEARCH = {
+    'BACKEND': os.getenv('CONTACT_SEARCH_BACKEND', 'trigram'),
+    'CACHE_ALIAS': 'default',
+    'CACHE_TIMEOUT': int(os.getenv('CONTACT_SEARCH_CACHE_TIMEOUT', 300)),
+    'MAX_RESULTS': int(os.getenv('CONTACT_SEARCH_MAX_RESULTS', 1000)),
+    'SUGGEST_LIMIT': int(os.getenv('CONTACT_SUGGEST_LIMIT', 10)),
+}
+
+# Per-request query/timing instrumentation (addressbook.middleware).
+# Views can declare a query_budget; STRICT_BUDGETS turns an exceeded
+# budget into an exception so tests fail on query regressions. The
+# X-Query-Count/X-Query-Budget and Server-Timing headers are only sent in
+# DEBUG, to staff users, or to everyone with EXPOSE_HEADERS.
+INSTRUMENTATION = {
+    'ENABLED': os.getenv('INSTRUMENTATION_ENABLED', 'True') == 'True',
+    'EXPOSE_HEADERS': os.getenv('INSTRUMENTATION_EXPOSE_HEADERS', 'False') == 'True',
+    'SERVER_TIMING': os.getenv('INSTRUMENTATION_SERVER_TIMING', 'True') == 'True',
+    'SLOW_REQUEST_MS': int(os.getenv('INSTRUMENTATION_SLOW_REQUEST_MS', 500)),
+    'N_PLUS_ONE_THRESHOLD': int(os.getenv('INSTRUMENTATION_N_PLUS_ONE_THRESHOLD', 5)),
+    'STRICT_BUDGETS': os.getenv('INSTRUMENTATION_STRICT_BUDGETS', 'False') == 'True',
+}
+
+# Token -> user resolution cached by api.authentication.CachedTokenAuthentication
+API_TOKEN_CACHE = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': int(os.getenv('API_TOKEN_CACHE_TIMEOUT', 60)),
+}
+
+# Per-contact serialized representations cached by the API. Entries are
+# deleted when a contact or its links change; TIMEOUT only bounds how long
+# a fill that raced with a write can serve stale data.
+CONTACT_REPRESENTATION_CACHE = {
+    'ENABLED': os.getenv('CONTACT_REPRESENTATION_CACHE', 'True') == 'True',
+    'TIMEOUT': int(os.getenv('CONTACT_REPRESENTATION_CACHE_TIMEOUT', 3600)),
+}
+
+# /api/contacts/<pk>/network/: traversal depth and node caps
+CONTACT_NETWORK = {
+    'MAX_DEPTH': int(os.getenv('CONTACT_NETWORK_MAX_DEPTH', 5)),
+    'MAX_NODES': int(os.getenv('CONTACT_NETWORK_MAX_NODES', 500)),
+}
+
+# Bulk create/update/delete endpoint (/api/contacts/bulk/). CHUNK_SIZE is
+# the default and maximum number of items committed per transaction.
+CONTACT_BULK = {
+    'MAX_ITEMS': int(os.getenv('CONTACT_BULK_MAX_ITEMS', 5000)),
+    'CHUNK_SIZE': int(os.getenv('CONTACT_BULK_CHUNK_SIZE', 500)),
+}
+
+# Streaming export (/api/contacts/export/, manage.py export_contacts).
+# CHUNK_SIZE is the number of rows fetched per server-side cursor round trip.
+CONTACT_EXPORT = {
+    'CHUNK_SIZE': int(os.getenv('CONTACT_EXPORT_CHUNK_SIZE', 2000)),
+}
+
+# Reverse phone/email lookup (/api/contacts/lookup/). Results are cached
+# under the contacts version in an in-process LRU of LOCAL_MAX_ENTRIES and
+# in the shared cache; misses for NEGATIVE_TIMEOUT seconds.
+CONTACT_LOOKUP = {
+    'LOCAL_MAX_ENTRIES': int(os.getenv('CONTACT_LOOKUP_LOCAL_MAX_ENTRIES', 10000)),
+    'TIMEOUT': int(os.getenv('CONTACT_LOOKUP_CACHE_TIMEOUT', 3600)),
+    'NEGATIVE_TIMEOUT': int(os.getenv('CONTACT_LOOKUP_NEGATIVE_TIMEOUT', 60)),
+}
+
+# Duplicate detection (manage.py find_duplicates). THRESHOLD is the minimum
+# weighted score (0-1) for a pair to be merged, and MIN_NAME_SIMILARITY
+# the trigram similarity its names need on top of it (a shared phone and
+# email alone can clear THRESHOLD); blocks larger than MAX_BLOCK_SIZE are
+# skipped; PHONE_DIGITS is how many trailing digits make up the phone
+# blocking key.
+CONTACT_DEDUPE = {
+    'THRESHOLD': float(os.getenv('CONTACT_DEDUPE_THRESHOLD', 0.55)),
+    'MIN_NAME_SIMILARITY': float(os.getenv('CONTACT_DEDUPE_MIN_NAME_SIMILARITY', 0.4)),
+    'MAX_BLOCK_SIZE': int(os.getenv('CONTACT_DEDUPE_MAX_BLOCK_SIZE', 50)),
+    'PHONE_DIGITS': int(os.getenv('CONTACT_DEDUPE_PHONE_DIGITS', 9)),
+}
+
+# Django admin for large contact tables: changelist totals come from the
+# planner's estimate above EXACT_COUNT_LIMIT rows, and the company filter
+# lists the COMPANY_FACET_SIZE most common companies, cached for
+# COMPANY_FACET_TIMEOUT seconds.
+CONTACT_ADMIN = {
+    'EXACT_COUNT_LIMIT': int(os.getenv('CONTACT_ADMIN_EXACT_COUNT_LIMIT', 10000)),
+    'COMPANY_FACET_SIZE': int(os.getenv('CONTACT_ADMIN_COMPANY_FACET_SIZE', 50)),
+    'COMPANY_FACET_TIMEOUT': int(os.getenv('CONTACT_ADMIN_COMPANY_FACET_TIMEOUT', 600)),
+}
+
 # Security settings
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
@@ -2,10 +2,12 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from .views import health
 
 # Optionally include DRF's built-in docs if in DEBUG mode
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('health/', health, name='health'),
 
     # App-specific URLs
     path('', include('contacts.urls')),
@@ -0,0 +1,22 @@
+from django.db import connection
+from django.http import JsonResponse
+
+from .db.backends.pooled_postgresql.pool import pool_stats
+
+
+def health(request):
+    """
+    Liveness check used by docker-compose; also reports this worker's
+    database pool counters when pooling is enabled
+    """
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        database = 'ok'
+    except Exception as exc:
+        database = f'error: {exc.__class__.__name__}'
+    data = {'status': 'ok' if database == 'ok' else 'error', 'database': database}
+    stats = pool_stats()
+    if stats:
+        data['database_pool'] = stats
+    return JsonResponse(data, status=200 if database == 'ok' else 503)
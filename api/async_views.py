@@ -0,0 +1,204 @@
+# Async read endpoints for the ASGI deployment (addressbook/asgi.py), so
+# that one worker can keep many slow requests in flight. Simple lookups
+# use the async ORM; search and serialization reuse the sync services and
+# their caches through one sync_to_async hop per request, run in the
+# thread pool rather than the single thread shared with the sync code.
+# Authentication, permissions, throttling and replica routing are the same
+# as for the equivalent DRF views.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.request import Request
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.views import APIView
+
+from addressbook.routers import replica_reads
+from contacts.conditional import (
+    contacts_etag, contacts_last_modified, report_etag, report_last_modified
+)
+from contacts.models import Contact, RelationshipStats
+from contacts.search import find_contacts, suggest_contacts
+from contacts.stats import SNAPSHOT_PK, get_relationship_stats
+from .serializers import ContactSerializer
+from .views import relationship_report_data
+
+
+class AsyncEndpointPolicy(APIView):
+    """
+    Authentication, permission and throttle settings of the async views:
+    the DRF defaults, like the sync API views they mirror
+    """
+    throttle_scope = None
+
+
+def _check_access(request, throttle_scope=None):
+    """
+    Run the DRF authentication, permission and throttle checks.
+
+    Returns the error response the sync views would send, or None when the
+    request may proceed. The authenticated user is set on ``request``.
+    """
+    view = AsyncEndpointPolicy(throttle_scope=throttle_scope)
+    if throttle_scope:
+        view.throttle_classes = [ScopedRateThrottle]
+    view.args, view.kwargs = (), {}
+    view.request = drf_request = view.initialize_request(request)
+    view.headers = view.default_response_headers
+    try:
+        view.initial(drf_request)
+    except Exception as exc:
+        response = view.handle_exception(exc)
+        error = JsonResponse(response.data, status=response.status_code)
+        for header, value in response.items():
+            error.headers.setdefault(header, value)
+        return error
+    return None
+
+
+def _read_only(func):
+    """
+    sync_to_async for read-only ORM and serialization work. It runs in the
+    thread pool instead of queueing behind the one thread shared with the
+    sync code, on that pool thread's own connection, which is released
+    afterwards like at the end of a request.
+    """
+    def run(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+async def _denied(request, throttle_scope=None):
+    return await sync_to_async(_check_access)(request, throttle_scope)
+
+
+async def _not_modified(request, etag_func, last_modified_func):
+    """
+    Async counterpart of django.views.decorators.http.condition: returns
+    a 304/412 response or None, plus the validator headers to set
+    """
+    etag = await _read_only(etag_func)(request)
+    last_modified = await _read_only(last_modified_func)(request)
+    validators = {}
+    if etag:
+        etag = validators['ETag'] = quote_etag(etag)
+    if last_modified is not None:
+        last_modified = int(last_modified.timestamp())
+        validators['Last-Modified'] = http_date(last_modified)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    return response, validators
+
+
+def _with_validators(response, validators):
+    for header, value in validators.items():
+        response.headers.setdefault(header, value)
+    return response
+
+
+def _serialize(request, contacts, many=False):
+    return ContactSerializer(contacts, many=many, context={'request': Request(request)}).data
+
+
+def _search_page(request, text, backend, offset, limit):
+    results = find_contacts(text, backend=backend)
+    contacts = list(results[offset:offset + limit])
+    return {
+        'count': len(results),
+        'offset': offset,
+        'limit': limit,
+        'truncated': results.truncated,
+        'results': _serialize(request, contacts, many=True),
+    }
+
+
+def _int_param(request, name, default, maximum):
+    try:
+        value = int(request.GET.get(name, default))
+    except ValueError:
+        value = default
+    return max(0, min(value, maximum))
+
+
+@replica_reads
+async def contact_search(request):
+    """GET ?q=&backend=&offset=&limit= — ranked search results"""
+    denied = await _denied(request)
+    if denied is not None:
+        return denied
+    not_modified, validators = await _not_modified(request, contacts_etag, contacts_last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    text = request.GET.get('q', '').strip()
+    limit = _int_param(request, 'limit', settings.REST_FRAMEWORK['PAGE_SIZE'], 100) or 1
+    offset = _int_param(request, 'offset', 0, settings.CONTACT_SEARCH['MAX_RESULTS'])
+    if not text:
+        data = {'count': 0, 'offset': offset, 'limit': limit, 'results': []}
+    else:
+        data = await _read_only(_search_page)(
+            request, text, request.GET.get('backend'), offset, limit
+        )
+    return _with_validators(JsonResponse(data), validators)
+
+
+@replica_reads
+async def contact_suggest(request):
+    """GET ?q=&limit= — typeahead suggestions"""
+    denied = await _denied(request, throttle_scope='contact_suggest')
+    if denied is not None:
+        return denied
+    text = request.GET.get('q', '')
+    limit = request.GET.get('limit')
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return JsonResponse({'limit': ["Expected a positive integer."]}, status=400)
+    suggestions = await _read_only(suggest_contacts)(text, limit)
+    return JsonResponse({'results': suggestions})
+
+
+@replica_reads
+async def contact_detail(request, pk):
+    """GET a single contact in the ContactSerializer representation"""
+    denied = await _denied(request)
+    if denied is not None:
+        return denied
+    not_modified, validators = await _not_modified(request, contacts_etag, contacts_last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    contact = await Contact.objects.filter(pk=pk).afirst()
+    if contact is None:
+        # The body DRF sends for get_object_or_404 in the sync view
+        detail = f"No {Contact._meta.object_name} matches the given query."
+        return JsonResponse({'detail': detail}, status=404)
+    data = await _read_only(_serialize)(request, contact)
+    return _with_validators(JsonResponse(data), validators)
+
+
+@replica_reads
+async def relationship_report(request):
+    """GET the relationship statistics snapshot, as /api/contacts/relationship-report/"""
+    denied = await _denied(request)
+    if denied is not None:
+        return denied
+    not_modified, validators = await _not_modified(request, report_etag, report_last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    stats = await RelationshipStats.objects.filter(pk=SNAPSHOT_PK).afirst()
+    if stats is None:
+        # First request builds the snapshot
+        stats = await sync_to_async(get_relationship_stats)()
+    data = await _read_only(relationship_report_data)(stats)
+    # DRF's encoder, so as_of is rendered exactly as by the sync view
+    return _with_validators(JsonResponse(data, encoder=JSONEncoder), validators)
@@ -0,0 +1,61 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+
+def get_token_cache():
+    return caches[settings.API_TOKEN_CACHE['CACHE_ALIAS']]
+
+
+def token_cache_key(key):
+    # Token keys are credentials; only a digest goes into the cache key
+    return 'api:token:' + hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def invalidate_tokens(keys):
+    """Drop cached tokens once the current transaction commits"""
+    cache_keys = [token_cache_key(key) for key in keys]
+    if cache_keys:
+        transaction.on_commit(lambda: get_token_cache().delete_many(cache_keys))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that caches the token -> user resolution in the
+    shared cache for API_TOKEN_CACHE['TIMEOUT'] seconds.
+
+    Only the token key, user id and is_active flag are cached, never the
+    user row (which carries the password hash). On a hit the user is a
+    model instance with every other field deferred, so a view that reads
+    one of them loads it then.
+
+    Entries are dropped when the token is deleted or its user is saved
+    (for example deactivated); see api/signals.py.
+    """
+    def authenticate_credentials(self, key):
+        cache = get_token_cache()
+        cache_key = token_cache_key(key)
+        cached = cache.get(cache_key)
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key, {
+                'key': token.key,
+                'user_id': user.pk,
+                'is_active': user.is_active,
+            }, settings.API_TOKEN_CACHE['TIMEOUT'])
+            return (user, token)
+
+        if not cached['is_active']:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        model = self.get_model()
+        user_model = model._meta.get_field('user').related_model
+        user = user_model.from_db(
+            None, [user_model._meta.pk.attname, 'is_active'], [cached['user_id'], cached['is_active']]
+        )
+        token = model.from_db(None, ['key', 'user_id'], [cached['key'], cached['user_id']])
+        token.user = user
+        return (user, token)
@@ -0,0 +1,301 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from contacts.cache import bump_contacts_version, invalidate_contacts
+from contacts.links import LinkedClients, linked_contact_ids, refresh_link_counts
+from contacts.models import Contact, normalize_email, normalize_phone
+from contacts.stats import apply_stats_delta, link_state
+from .serializers import ContactSerializer
+
+# Fields with a unique constraint, checked with one query per key per batch
+UNIQUE_KEYS = ('email', 'phone_number', 'file_number')
+
+
+class BulkContactSerializer(ContactSerializer):
+    """
+    Field-level validation for one item of a bulk request.
+
+    The per-row uniqueness and linked_clients lookups done by
+    ContactSerializer are disabled; BulkContactProcessor checks them for
+    the whole batch at once.
+    """
+    linked_clients = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        help_text="List of IDs of linked client contacts"
+    )
+
+    class Meta(ContactSerializer.Meta):
+        extra_kwargs = {
+            'file_number': {'required': True, 'validators': []},
+            'email': {'validators': []},
+            'phone_number': {'validators': []},
+        }
+
+    def validate(self, data):
+        return data
+
+
+def get_chunk_size(requested=None):
+    """Clamp a requested transaction chunk size to CONTACT_BULK['CHUNK_SIZE']"""
+    default = settings.CONTACT_BULK['CHUNK_SIZE']
+    try:
+        requested = int(requested)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(requested, default))
+
+
+class BulkContactProcessor:
+    """
+    Validate and apply a batch of contact creates, updates or deletes.
+
+    Validation is done for the whole batch with one query per unique key
+    and one for linked client ids; writes use bulk_create/bulk_update and
+    bulk through-table inserts, committed in chunks so that one failing
+    chunk does not roll back the others. Every method returns one result
+    dict per input item, in input order.
+    """
+
+    def __init__(self, context=None, chunk_size=None):
+        self.context = context or {}
+        self.chunk_size = chunk_size or settings.CONTACT_BULK['CHUNK_SIZE']
+
+    # Validation helpers
+
+    def _validate_items(self, items, instances=None):
+        """Run field validation; returns {index: validated_data} and fills errors"""
+        valid = {}
+        for index, item in enumerate(items):
+            instance = instances.get(index) if instances is not None else None
+            if instances is not None and instance is None:
+                continue
+            serializer = BulkContactSerializer(
+                instance, data=item, partial=instance is not None, context=self.context
+            )
+            if serializer.is_valid():
+                data = dict(serializer.validated_data)
+                if 'email' in data:
+                    data['email'] = normalize_email(data['email'])
+                if 'phone_number' in data:
+                    data['phone_number'] = normalize_phone(data['phone_number'])
+                valid[index] = data
+            else:
+                self.errors[index] = serializer.errors
+        return valid
+
+    def _check_unique_keys(self, valid, owners=None):
+        """
+        Reject items whose unique keys collide within the batch or with
+        another existing contact. ``owners`` maps index to the contact id
+        the item updates, so a contact may keep its own values.
+        """
+        owners = owners or {}
+        for key in UNIQUE_KEYS:
+            seen = {}
+            for index, data in list(valid.items()):
+                if key not in data:
+                    continue
+                if data[key] in seen:
+                    self._fail(valid, index, {key: [f"Duplicate {key} within this request"]})
+                else:
+                    seen[data[key]] = index
+            existing = dict(
+                Contact.objects.filter(**{f'{key}__in': list(seen)}).values_list(key, 'pk')
+            )
+            for value, index in seen.items():
+                if value in existing and existing[value] != owners.get(index):
+                    self._fail(valid, index, {key: [f"A contact with this {key} already exists"]})
+
+    def _check_linked_clients(self, valid, owners=None):
+        owners = owners or {}
+        requested = {pk for data in valid.values() for pk in data.get('linked_clients', [])}
+        found = set(Contact.objects.filter(pk__in=requested).values_list('pk', flat=True))
+        for index, data in list(valid.items()):
+            linked = set(data.get('linked_clients', []))
+            missing = sorted(linked - found)
+            if missing:
+                self._fail(valid, index, {'linked_clients': [f"Unknown contact ids: {missing}"]})
+            elif owners.get(index) in linked:
+                self._fail(valid, index, {'linked_clients': ["A contact cannot be linked to itself"]})
+
+    def _fail(self, valid, index, errors):
+        valid.pop(index, None)
+        self.errors[index] = errors
+
+    def _chunks(self, indexes):
+        indexes = sorted(indexes)
+        for start in range(0, len(indexes), self.chunk_size):
+            yield indexes[start:start + self.chunk_size]
+
+    def _results(self, count, status, ids):
+        results = []
+        for index in range(count):
+            if index in self.errors:
+                results.append({'index': index, 'status': 'error', 'errors': self.errors[index]})
+            else:
+                results.append({'index': index, 'status': status, 'id': ids[index]})
+        return results
+
+    def _finish(self, touched, created=0):
+        refresh_link_counts(touched)
+        if created:
+            apply_stats_delta(total=created)
+        bump_contacts_version()
+
+    # Operations
+
+    def create(self, items):
+        self.errors = {}
+        valid = self._validate_items(items)
+        self._check_unique_keys(valid)
+        self._check_linked_clients(valid)
+
+        ids, touched = {}, set()
+        for chunk in self._chunks(valid):
+            try:
+                with transaction.atomic():
+                    contacts = Contact.objects.bulk_create([
+                        Contact(**{k: v for k, v in valid[i].items() if k != 'linked_clients'})
+                        for i in chunk
+                    ])
+                    links = []
+                    for index, contact in zip(chunk, contacts):
+                        ids[index] = contact.pk
+                        links += [(contact.pk, pk) for pk in valid[index].get('linked_clients', [])]
+                    self._insert_links(links)
+            except IntegrityError as exc:
+                for index in chunk:
+                    ids.pop(index, None)
+                    self.errors[index] = {'non_field_errors': [f"Write failed: {exc}"]}
+                continue
+            touched.update(pk for pair in links for pk in pair)
+
+        self._finish(touched, created=len(ids))
+        return self._results(len(items), 'created', ids)
+
+    def update(self, items):
+        self.errors = {}
+        item_ids = {}
+        for index, item in enumerate(items):
+            pk = item.get('id') if isinstance(item, dict) else None
+            if isinstance(pk, int):
+                item_ids[index] = pk
+            else:
+                self.errors[index] = {'id': ["An integer id is required for updates"]}
+        contacts = Contact.objects.in_bulk(set(item_ids.values()))
+        instances = {}
+        for index, pk in item_ids.items():
+            if pk in contacts:
+                instances[index] = contacts[pk]
+            else:
+                self.errors[index] = {'id': [f"Contact {pk} does not exist"]}
+        duplicates = {pk for pk, n in Counter(item_ids.values()).items() if n > 1}
+        for index, pk in item_ids.items():
+            if pk in duplicates:
+                instances.pop(index, None)
+                self.errors[index] = {'id': ["Contact updated more than once in this request"]}
+
+        valid = self._validate_items(items, instances)
+        owners = {index: instances[index].pk for index in valid}
+        self._check_unique_keys(valid, owners)
+        self._check_linked_clients(valid, owners)
+
+        touched = set()
+        now = timezone.now()
+        for chunk in self._chunks(valid):
+            changed_fields = {'updated_at'}
+            relinked = {}
+            for index in chunk:
+                contact = instances[index]
+                for name, value in valid[index].items():
+                    if name == 'linked_clients':
+                        relinked[contact.pk] = value
+                    else:
+                        setattr(contact, name, value)
+                        changed_fields.add(name)
+                contact.updated_at = now
+            try:
+                with transaction.atomic():
+                    Contact.objects.bulk_update(
+                        [instances[index] for index in chunk], sorted(changed_fields)
+                    )
+                    if relinked:
+                        # linked_clients replaces the existing links, as in
+                        # ContactSerializer.update
+                        previous = set(LinkedClients.objects.filter(
+                            from_contact__in=relinked
+                        ).values_list('to_contact', flat=True))
+                        LinkedClients.objects.filter(from_contact__in=relinked).delete()
+                        links = [(src, dst) for src, dsts in relinked.items() for dst in dsts]
+                        self._insert_links(links)
+            except IntegrityError as exc:
+                for index in chunk:
+                    self.errors[index] = {'non_field_errors': [f"Write failed: {exc}"]}
+                continue
+            invalidate_contacts(instances[index].pk for index in chunk)
+            if relinked:
+                touched.update(relinked, previous, (dst for _, dst in links))
+
+        self._finish(touched)
+        return self._results(len(items), 'updated', {i: c.pk for i, c in instances.items()})
+
+    def delete(self, items):
+        self.errors = {}
+        ids = {}
+        for index, pk in enumerate(items):
+            if isinstance(pk, dict):
+                pk = pk.get('id')
+            if isinstance(pk, int):
+                ids[index] = pk
+            else:
+                self.errors[index] = {'id': ["An integer id is required for deletes"]}
+
+        table = connection.ops.quote_name(Contact._meta.db_table)
+        deleted, touched = set(), set()
+        total = linked = with_links = 0
+        for chunk in self._chunks(ids):
+            chunk_ids = list({ids[index] for index in chunk})
+            with transaction.atomic():
+                neighbours = linked_contact_ids(chunk_ids)
+                counts = Contact.objects.filter(pk__in=chunk_ids).values_list(
+                    'linked_clients_count', 'linked_files_count'
+                )
+                for clients_count, files_count in counts:
+                    has_clients, has_links = link_state(clients_count, files_count)
+                    linked -= has_clients
+                    with_links -= has_links
+                # Delete links and contacts set-wise; Contact signals would
+                # otherwise run per row.
+                LinkedClients.objects.filter(
+                    Q(from_contact__in=chunk_ids) | Q(to_contact__in=chunk_ids)
+                ).delete()
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"DELETE FROM {table} WHERE id = ANY(%s) RETURNING id", [chunk_ids]
+                    )
+                    removed = {pk for pk, in cursor.fetchall()}
+            deleted |= removed
+            total -= len(removed)
+            touched |= neighbours - removed
+
+        for index, pk in ids.items():
+            if pk not in deleted:
+                self.errors[index] = {'id': [f"Contact {pk} does not exist"]}
+        refresh_link_counts(touched)
+        invalidate_contacts(deleted)
+        apply_stats_delta(total=total, linked=linked, with_links=with_links, refresh_top=True)
+        bump_contacts_version()
+        return self._results(len(items), 'deleted', ids)
+
+    def _insert_links(self, pairs):
+        LinkedClients.objects.bulk_create(
+            [LinkedClients(from_contact_id=src, to_contact_id=dst) for src, dst in pairs],
+            batch_size=self.chunk_size,
+            ignore_conflicts=True
+        )
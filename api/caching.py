@@ -0,0 +1,58 @@
+from django.conf import settings
+
+from addressbook.routers import reads_may_be_stale
+from contacts.cache import get_cache, get_representation_generation, representation_key
+
+HITS_KEY = 'contacts:repr:hits'
+MISSES_KEY = 'contacts:repr:misses'
+
+
+def _count(key, amount):
+    if not amount:
+        return
+    cache = get_cache()
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        cache.add(key, amount, timeout=None)
+
+
+def get_cache_stats():
+    """Return the representation cache hit/miss counters"""
+    counters = get_cache().get_many([HITS_KEY, MISSES_KEY])
+    hits = counters.get(HITS_KEY, 0)
+    misses = counters.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
+
+
+def cached_representations(contacts, serialize):
+    """
+    Return the serialized representation of each contact, in order.
+
+    Cached fragments are fetched with a single multi-get; only the misses
+    are passed to ``serialize`` (a callable taking a list of contacts and
+    returning their representations) and then written back in one call.
+    """
+    cache = get_cache()
+    generation = get_representation_generation()
+    keys = [representation_key(contact.pk, generation) for contact in contacts]
+    found = cache.get_many(keys)
+
+    missing = [(key, contact) for key, contact in zip(keys, contacts) if key not in found]
+    if missing:
+        fresh = dict(zip(
+            (key for key, _ in missing),
+            serialize([contact for _, contact in missing])
+        ))
+        if not reads_may_be_stale():
+            cache.set_many(fresh, settings.CONTACT_REPRESENTATION_CACHE['TIMEOUT'])
+        found.update(fresh)
+
+    _count(HITS_KEY, len(keys) - len(missing))
+    _count(MISSES_KEY, len(missing))
+    return [found[key] for key in keys]
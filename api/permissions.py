@@ -11,5 +11,10 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
 
+        # Objects without an owner field (contacts are shared by all
+        # users) are left to the view-level permissions.
+        if not hasattr(obj, 'owner'):
+            return True
+
         # Write permissions are only allowed to the owner of the object.
         return obj.owner == request.user
@@ -1,5 +1,91 @@
+from django.conf import settings
+from django.db import models
+from django.db.models import Prefetch, prefetch_related_objects
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from addressbook.instrumentation import timed
 from contacts.models import Contact
+from .caching import cached_representations
+
+# Hard limit for ?expand=linked_clients&depth=N
+MAX_EXPAND_DEPTH = 3
+
+
+def get_expand_depth(request):
+    """
+    Return how many levels of linked_clients_details the request asked for.
+
+    0 unless ?expand=linked_clients is given; ?depth defaults to 1 and is
+    clamped to MAX_EXPAND_DEPTH.
+    """
+    if request is None:
+        return 0
+    expand = request.query_params.get('expand', '').split(',')
+    if 'linked_clients' not in expand:
+        return 0
+    try:
+        depth = int(request.query_params.get('depth', 1))
+    except ValueError:
+        depth = 1
+    return max(1, min(depth, MAX_EXPAND_DEPTH))
+
+
+def _parse_field_list(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def get_sparse_fields(request, available):
+    """
+    Return the names from ``available`` selected by ?fields= and ?omit=.
+
+    Returns None when the request does not ask for a sparse fieldset. Only
+    read requests are trimmed so that writes still validate every field.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    fields = _parse_field_list(request.query_params.get('fields', ''))
+    omit = _parse_field_list(request.query_params.get('omit', ''))
+    if not fields and not omit:
+        return None
+    return [
+        name for name in available
+        if (not fields or name in fields) and name not in omit
+    ]
+
+
+def prefetch_linked_clients(contacts, depth):
+    """
+    Load linked clients for ``contacts`` down to ``depth`` levels.
+
+    Issues one query per level regardless of how many contacts are given:
+    full rows for the expanded levels, then ids only for the level below,
+    which is all the linked_clients field of the deepest nodes needs.
+    """
+    lookup = 'linked_clients'
+    lookups = []
+    for _ in range(depth):
+        lookups.append(lookup)
+        lookup += '__linked_clients'
+    lookups.append(Prefetch(lookup, queryset=Contact.objects.only('id')))
+    prefetch_related_objects(contacts, *lookups)
+
+
+class ContactListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        """
+        Assemble rows from cached fragments where possible; batch-load
+        linked clients for the remaining rows before serializing them
+        """
+        contacts = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        with timed('serialize'):
+            if self.child.uses_representation_cache:
+                return cached_representations(contacts, self._serialize)
+            return self._serialize(contacts)
+
+    def _serialize(self, contacts):
+        self.child.prefetch_related_for(contacts)
+        return super().to_representation(contacts)
+
 
 class ContactSerializer(serializers.ModelSerializer):
     linked_clients = serializers.PrimaryKeyRelatedField(
@@ -15,6 +101,11 @@ class ContactSerializer(serializers.ModelSerializer):
         help_text="Detailed information about linked clients"
     )
     
+    linked_clients_count = serializers.IntegerField(
+        read_only=True,
+        help_text="Count of clients linked to this file"
+    )
+    
     linked_files_count = serializers.IntegerField(
         read_only=True,
         help_text="Count of files this client is linked to"
@@ -36,23 +127,86 @@ class ContactSerializer(serializers.ModelSerializer):
             'company',
             'linked_clients',
             'linked_clients_details',
+            'linked_clients_count',
             'linked_files_count',
             'created_at',
             'updated_at'
         ]
-        read_only_fields = ['created_at', 'updated_at', 'linked_clients_details', 'linked_files_count']
+        read_only_fields = [
+            'created_at', 'updated_at', 'linked_clients_details',
+            'linked_clients_count', 'linked_files_count'
+        ]
         extra_kwargs = {
             'file_number': {'required': True},
             'email': {'validators': []}  # Disable unique validation for updates
         }
+        list_serializer_class = ContactListSerializer
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # linked_clients_details is only rendered when explicitly expanded
+        if not self.expand_depth:
+            self.fields.pop('linked_clients_details', None)
+
+        selected = get_sparse_fields(self.context.get('request'), list(self.fields))
+        if selected is not None:
+            for name in set(self.fields) - set(selected):
+                self.fields.pop(name)
+
+    @property
+    def expand_depth(self):
+        if 'expand_depth' in self.context:
+            return self.context['expand_depth']
+        return get_expand_depth(self.context.get('request'))
+
+    def prefetch_related_for(self, contacts):
+        """Batch-load the relations this serializer will render for ``contacts``"""
+        if self.context.get('linked_clients_prefetched'):
+            return
+        if 'linked_clients' in self.fields or 'linked_clients_details' in self.fields:
+            prefetch_linked_clients(contacts, self.expand_depth)
+
+    @property
+    def uses_representation_cache(self):
+        """
+        Only the default representation of a read request is cached:
+        expanded or sparse variants are built per request, and writes
+        must return what was just saved.
+        """
+        request = self.context.get('request')
+        return (
+            settings.CONTACT_REPRESENTATION_CACHE['ENABLED']
+            and request is not None
+            and request.method in SAFE_METHODS
+            and not self.expand_depth
+            and set(self.fields) == CACHED_FIELDS
+        )
+
+    def to_representation(self, instance):
+        if self.parent is None:
+            with timed('serialize'):
+                if self.uses_representation_cache:
+                    return cached_representations([instance], self._serialize)[0]
+                return self._serialize([instance])[0]
+        return super().to_representation(instance)
+
+    def _serialize(self, contacts):
+        self.prefetch_related_for(contacts)
+        representations = []
+        for contact in contacts:
+            representations.append(super().to_representation(contact))
+        return representations
 
     def get_linked_clients_details(self, obj):
-        """Return nested details of linked clients"""
-        from .serializers import ContactSerializer  # Avoid circular import
+        """Return nested details of linked clients, one level shallower"""
         return ContactSerializer(
             obj.linked_clients.all(),
             many=True,
-            context=self.context
+            context={
+                **self.context,
+                'expand_depth': self.expand_depth - 1,
+                'linked_clients_prefetched': True,
+            }
         ).data
 
     def validate(self, data):
@@ -79,6 +233,8 @@ class ContactSerializer(serializers.ModelSerializer):
         linked_clients = validated_data.pop('linked_clients', [])
         contact = Contact.objects.create(**validated_data)
         contact.linked_clients.set(linked_clients)
+        # The link counters were refreshed in the database by m2m_changed
+        contact.refresh_from_db(fields=['linked_clients_count', 'linked_files_count'])
         return contact
 
     def update(self, instance, validated_data):
@@ -93,5 +249,11 @@ class ContactSerializer(serializers.ModelSerializer):
         # Update relationships if provided
         if linked_clients is not None:
             instance.linked_clients.set(linked_clients)
+            instance.refresh_from_db(fields=['linked_clients_count', 'linked_files_count'])
             
-        return instance
\ No newline at end of file
+        return instance
+
+
+# Fields of the default (unexpanded, unfiltered) representation, the only
+# one kept in the per-contact cache
+CACHED_FIELDS = set(ContactSerializer.Meta.fields) - {'linked_clients_details'}
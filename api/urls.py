@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework.authtoken.views import obtain_auth_token
+from . import async_views
 from .views import (
     ContactViewSet,
     ContactSearchView,
@@ -28,5 +29,11 @@ urlpatterns = [
     # DRF’s built-in login/logout views (browsable API support)
     path('api-auth/', include('rest_framework.urls', namespace='rest_framework')),
 
+    # Async read endpoints, for the ASGI deployment (addressbook/asgi.py)
+    path('async/search/', async_views.contact_search, name='async-contact-search'),
+    path('async/suggest/', async_views.contact_suggest, name='async-contact-suggest'),
+    path('async/contacts/<int:pk>/', async_views.contact_detail, name='async-contact-detail'),
+    path('async/relationship-report/', async_views.relationship_report, name='async-relationship-report'),
+
     # Additional routes like /contacts/relationship-report/ are handled by the ViewSet
 ]
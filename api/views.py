@@ -1,14 +1,28 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils.decorators import method_decorator
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.views import APIView
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import ListAPIView
-from django.contrib.postgres.search import SearchQuery, SearchRank
-from django.db.models import Q, Count, Prefetch
+from rest_framework.throttling import ScopedRateThrottle
+from addressbook.routers import replica_reads
+from contacts.conditional import contacts_condition, report_condition
+from contacts.export import WRITERS, aiter_export, export_contacts
+from contacts.lookup import LOOKUP_FIELDS, lookup_contact
 from contacts.models import Contact
-from .serializers import ContactSerializer
+from contacts.network import DIRECTIONS, contact_network
+from contacts.pagination import KEYSET_FIELDS
+from contacts.search import find_contacts, suggest_contacts
+from contacts.stats import get_relationship_stats
+from .bulk import BulkContactProcessor, get_chunk_size
+from .caching import get_cache_stats
+from .pagination import ContactKeysetPagination, SearchResultsPagination
+from .serializers import ContactSerializer, get_sparse_fields
 from .permissions import IsOwnerOrReadOnly
 
 @api_view(['GET'])
@@ -24,120 +38,326 @@ def api_root(request, format=None):
         'api-auth': reverse('rest_framework:login', request=request, format=format),
     })
 
-class ContactSearchView(ListAPIView):
+def relationship_report_data(stats):
+    """
+    Relationship report payload for the ``stats`` snapshot, with the top
+    contacts serialized; shared by the sync and async report endpoints
+    """
+    top_ids = [entry['id'] for entry in stats.top_files + stats.top_clients]
+    contacts = Contact.objects.in_bulk(top_ids)
+    top_files = [contacts[e['id']] for e in stats.top_files if e['id'] in contacts]
+    top_clients = [contacts[e['id']] for e in stats.top_clients if e['id'] in contacts]
+
+    return {
+        'top_files': ContactSerializer(top_files, many=True).data,
+        'top_clients': ContactSerializer(top_clients, many=True).data,
+        'stats': {
+            'total_contacts': stats.total_contacts,
+            'linked_contacts': stats.linked_contacts,
+            'unlinked_contacts': stats.unlinked_contacts,
+            'contacts_with_links': stats.contacts_with_links,
+        },
+        'as_of': stats.as_of,
+    }
+
+class SparseFieldsetMixin:
+    """
+    Push ?fields= / ?omit= down into the SQL projection.
+
+    ContactSerializer trims its output; this restricts the SELECT list to
+    the matching columns (plus the keyset ordering columns) with .only().
+    """
+    def apply_sparse_fieldset(self, queryset):
+        selected = get_sparse_fields(self.request, ContactSerializer.Meta.fields)
+        if selected is None:
+            return queryset
+        concrete = {field.name for field in Contact._meta.concrete_fields}
+        columns = {name for name in selected if name in concrete}
+        return queryset.only(*columns.union(KEYSET_FIELDS))
+
+@method_decorator(replica_reads, name='get')
+@method_decorator(contacts_condition, name='get')
+class ContactSearchView(SparseFieldsetMixin, ListAPIView):
     """
     Dedicated search endpoint for contacts
     """
     serializer_class = ContactSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = SearchResultsPagination
 
     def get_queryset(self):
-        queryset = Contact.objects.all()
+        queryset = self.apply_sparse_fieldset(Contact.objects.all())
         search_query = self.request.query_params.get('q', '').strip()
         
         if search_query:
-            queryset = queryset.annotate(
-                rank=SearchRank('search_vector', SearchQuery(search_query))
-            ).filter(
-                Q(search_vector=SearchQuery(search_query)) |
-                Q(first_name__icontains=search_query) |
-                Q(last_name__icontains=search_query) |
-                Q(file_number__icontains=search_query) |
-                Q(email__icontains=search_query)
-            ).order_by('-rank', 'last_name', 'first_name')
+            queryset = find_contacts(
+                search_query,
+                backend=self.request.query_params.get('backend'),
+                queryset=queryset
+            )
         
         return queryset
 
-class ContactViewSet(viewsets.ModelViewSet):
-    queryset = Contact.objects.all().order_by('last_name', 'first_name')
+class ContactViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = Contact.objects.all().order_by('last_name', 'first_name', 'id')
     serializer_class = ContactSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
     lookup_field = 'pk'
+    # Set per action for the actions throttled with ScopedRateThrottle
+    throttle_scope = None
+    # Checked by RequestInstrumentationMiddleware; includes up to two
+    # queries for session authentication
+    query_budget = {
+        'list': 6,
+        'retrieve': 5,
+        'linked_clients': 6,
+        'linked_files': 6,
+        'network': 6,
+        'suggest': 3,
+        'lookup': 3,
+        # Snapshot timestamp, snapshot, top contacts and their linked
+        # clients for each of the two lists
+        'relationship_report': 7,
+    }
+    
+    @property
+    def paginator(self):
+        """
+        Keyset pagination by default; page numbers for ranked search results
+        and for clients that still send ?page=
+        """
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if 'page' in params or params.get('search', '').strip():
+                self._paginator = SearchResultsPagination()
+            else:
+                self._paginator = ContactKeysetPagination()
+        return self._paginator
     
     def get_queryset(self):
         """
         Optimized queryset with search functionality and prefetching
         """
-        queryset = super().get_queryset()
-        search_query = self.request.query_params.get('search', None)
+        # linked_clients is batch-loaded by ContactSerializer, and only when
+        # it is part of the requested fields.
+        queryset = self.apply_sparse_fieldset(super().get_queryset())
+        search_query = self.request.query_params.get('search', '').strip()
         
-        # Prefetch related data to avoid N+1 queries
-        queryset = queryset.prefetch_related(
-            Prefetch('linked_clients', queryset=Contact.objects.only('id', 'first_name', 'last_name', 'file_number')),
-            Prefetch('linked_contacts', queryset=Contact.objects.only('id', 'first_name', 'last_name', 'file_number'))
-        )
-        
-        if search_query:
-            queryset = queryset.annotate(
-                rank=SearchRank('search_vector', SearchQuery(search_query))
-            ).filter(
-                Q(search_vector=SearchQuery(search_query)) |
-                Q(first_name__icontains=search_query) |
-                Q(last_name__icontains=search_query) |
-                Q(file_number__icontains=search_query) |
-                Q(email__icontains=search_query)
-            ).order_by('-rank', 'last_name', 'first_name')
+        # Search results are only used for listing; detail routes and
+        # actions keep working on the plain queryset.
+        if search_query and self.action == 'list':
+            queryset = find_contacts(
+                search_query,
+                backend=self.request.query_params.get('backend'),
+                queryset=queryset
+            )
             
         return queryset
     
+    @method_decorator(replica_reads)
+    @method_decorator(contacts_condition)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @method_decorator(replica_reads)
+    @method_decorator(contacts_condition)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+    
     @action(detail=True, methods=['get'], url_path='linked-clients', url_name='linked-clients')
+    @method_decorator(contacts_condition)
     def linked_clients(self, request, pk=None):
         """
         Get all clients linked to this contact (file)
         """
         contact = self.get_object()
-        page = self.paginate_queryset(contact.linked_clients.all())
+        queryset = self.apply_sparse_fieldset(contact.linked_clients.all())
+        page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
             
-        serializer = self.get_serializer(contact.linked_clients.all(), many=True)
+        serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
     
     @action(detail=True, methods=['get'], url_path='linked-files', url_name='linked-files')
+    @method_decorator(contacts_condition)
     def linked_files(self, request, pk=None):
         """
         Get all files linked to this contact (client)
         """
         contact = self.get_object()
-        page = self.paginate_queryset(contact.linked_contacts.all())
+        queryset = self.apply_sparse_fieldset(contact.linked_contacts.all())
+        page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
             
-        serializer = self.get_serializer(contact.linked_contacts.all(), many=True)
+        serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
     
-    @action(detail=False, methods=['get'], url_path='relationship-report', url_name='contact-relationship-report')
-    def relationship_report(self, request):
+    @action(detail=True, methods=['get'], url_path='network', url_name='network')
+    @method_decorator(contacts_condition)
+    def network(self, request, pk=None):
         """
-        Enhanced relationship report with statistics and serialized data
+        Subgraph reachable from this contact within ?depth= hops, following
+        linked clients, linked files or both (?direction=), as nodes and
+        edges computed by a single recursive query
         """
-        queryset = self.get_queryset()
+        contact = self.get_object()
+        direction = request.query_params.get('direction', 'both')
+        if direction not in DIRECTIONS:
+            raise ValidationError({'direction': f"Expected one of: {', '.join(DIRECTIONS)}."})
+        try:
+            depth = int(request.query_params.get('depth', 1))
+        except ValueError:
+            raise ValidationError({'depth': "Expected an integer."})
+        depth = max(1, min(depth, settings.CONTACT_NETWORK['MAX_DEPTH']))
         
-        top_files = queryset.annotate(
-            client_count=Count('linked_clients')
-        ).filter(client_count__gt=0).order_by('-client_count')[:10]
+        return Response(contact_network(contact.pk, depth=depth, direction=direction))
+    
+    @action(
+        detail=False,
+        methods=['post', 'patch', 'delete'],
+        url_path='bulk',
+        url_name='bulk',
+        permission_classes=[IsAuthenticated]
+    )
+    def bulk(self, request):
+        """
+        Batch endpoint: POST a list of contacts to create them, PATCH a list
+        of partial contacts with ``id`` to update them, DELETE a list of ids.
         
-        top_clients = queryset.annotate(
-            file_count=Count('linked_contacts')
-        ).filter(file_count__gt=0).order_by('-file_count')[:10]
+        Returns one result per item; ``?chunk_size=`` sets how many items are
+        committed per transaction.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError("Expected a list of items.")
+        if len(items) > settings.CONTACT_BULK['MAX_ITEMS']:
+            raise ValidationError(
+                f"At most {settings.CONTACT_BULK['MAX_ITEMS']} items per request."
+            )
         
-        data = {
-            'top_files': ContactSerializer(top_files, many=True).data,
-            'top_clients': ContactSerializer(top_clients, many=True).data,
-            'stats': {
-                'total_contacts': Contact.objects.count(),
-                'linked_contacts': Contact.objects.filter(linked_clients__isnull=False).count(),
-                'unlinked_contacts': Contact.objects.filter(linked_clients__isnull=True).count(),
-                'contacts_with_links': Contact.objects.filter(
-                    Q(linked_clients__isnull=False) | 
-                    Q(linked_contacts__isnull=False)
-                ).distinct().count()
-            }
-        }
-        return Response(data, status=status.HTTP_200_OK)
+        processor = BulkContactProcessor(
+            context=self.get_serializer_context(),
+            chunk_size=get_chunk_size(request.query_params.get('chunk_size'))
+        )
+        operation = {
+            'POST': processor.create,
+            'PATCH': processor.update,
+            'DELETE': processor.delete,
+        }[request.method]
+        results = operation(items)
+        
+        if any(result['status'] == 'error' for result in results):
+            response_status = status.HTTP_207_MULTI_STATUS
+        elif request.method == 'POST':
+            response_status = status.HTTP_201_CREATED
+        else:
+            response_status = status.HTTP_200_OK
+        return Response({'results': results}, status=response_status)
+    
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path='export',
+        url_name='export',
+        permission_classes=[IsAuthenticated]
+    )
+    def export(self, request):
+        """
+        Stream every contact as CSV or NDJSON (?output=csv|ndjson).
+        
+        ?links=true adds linked client ids. Rows are read with a server-side
+        cursor and written as they are produced, so memory stays flat; under
+        ASGI the output is handed over as an async iterator for the same reason.
+        """
+        output = request.query_params.get('output', 'csv')
+        if output not in WRITERS:
+            raise ValidationError({'output': f"Expected one of: {', '.join(sorted(WRITERS))}."})
+        include_links = request.query_params.get('links', '').lower() in ('1', 'true', 'yes')
+        
+        _, content_type = WRITERS[output]
+        chunk_size = settings.CONTACT_EXPORT['CHUNK_SIZE']
+        content = export_contacts(output, include_links=include_links, chunk_size=chunk_size)
+        if settings.SERVER_MODE == 'asgi':
+            content = aiter_export(content, batch_size=chunk_size)
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="contacts.{output}"'
+        return response
+    
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path='cache-stats',
+        url_name='cache-stats',
+        permission_classes=[IsAuthenticated]
+    )
+    def cache_stats(self, request):
+        """
+        Hit/miss counters of the per-contact representation cache
+        """
+        return Response(get_cache_stats())
     
-    def perform_create(self, serializer):
-        """Set the owner to the current user on creation"""
-        serializer.save(owner=self.request.user)
\ No newline at end of file
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path='suggest',
+        url_name='suggest',
+        throttle_classes=[ScopedRateThrottle],
+        throttle_scope='contact_suggest'
+    )
+    @method_decorator(replica_reads)
+    def suggest(self, request):
+        """
+        Lightweight typeahead: id, name and file number of the top prefix matches
+        """
+        limit = request.query_params.get('limit')
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except ValueError:
+                limit = 0
+            if limit < 1:
+                raise ValidationError({'limit': "Expected a positive integer."})
+        results = suggest_contacts(request.query_params.get('q', ''), limit=limit)
+        return Response({'results': results})
+    
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path='lookup',
+        url_name='lookup',
+        throttle_classes=[ScopedRateThrottle],
+        throttle_scope='contact_lookup'
+    )
+    @method_decorator(replica_reads)
+    def lookup(self, request):
+        """
+        Reverse lookup by ?phone= or ?email=, in any format the caller has.
+
+        The value is canonicalized like Contact.save() does and matched
+        exactly, so it is served by the unique index or the lookup caches.
+        """
+        given = [kind for kind in LOOKUP_FIELDS if request.query_params.get(kind, '').strip()]
+        if len(given) != 1:
+            raise ValidationError(f"Expected exactly one of: {', '.join(LOOKUP_FIELDS)}.")
+        kind = given[0]
+        contact = lookup_contact(kind, request.query_params[kind])
+        if contact is None:
+            return Response({'detail': "No contact matches the given query."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(contact)
+    
+    @action(detail=False, methods=['get'], url_path='relationship-report', url_name='contact-relationship-report')
+    @method_decorator(replica_reads)
+    @method_decorator(report_condition)
+    def relationship_report(self, request):
+        """
+        Enhanced relationship report with statistics and serialized data.
+        
+        Served from the relationship statistics snapshot; ``as_of`` tells
+        how fresh it is.
+        """
+        data = relationship_report_data(get_relationship_stats())
+        return Response(data, status=status.HTTP_200_OK)
@@ -1,9 +1,65 @@
+from django.conf import settings
 from django.contrib import admin
+from django.db.models import Count
+from django.utils.translation import gettext_lazy as _
+
+from .cache import get_cache
 from .models import Contact
+from .pagination import EstimatedCountPaginator
+from .search import search_contacts
+
+COMPANY_FACET_KEY = 'contacts:admin:companies'
+
+
+class CompanyListFilter(admin.SimpleListFilter):
+    """
+    Company facet limited to the CONTACT_ADMIN['COMPANY_FACET_SIZE'] most
+    common companies, cached for COMPANY_FACET_TIMEOUT seconds instead of
+    running SELECT DISTINCT company on every changelist load.
+    """
+    title = _('company')
+    parameter_name = 'company'
+
+    def lookups(self, request, model_admin):
+        cache = get_cache()
+        companies = cache.get(COMPANY_FACET_KEY)
+        if companies is None:
+            companies = list(
+                Contact.objects.exclude(company__isnull=True).exclude(company='')
+                .values('company').annotate(total=Count('id')).order_by('-total', 'company')
+                .values_list('company', flat=True)[:settings.CONTACT_ADMIN['COMPANY_FACET_SIZE']]
+            )
+            cache.set(COMPANY_FACET_KEY, companies, settings.CONTACT_ADMIN['COMPANY_FACET_TIMEOUT'])
+        return [(company, company) for company in companies]
+
+    def queryset(self, request, queryset):
+        # Any company can still be filtered on through the URL
+        if self.value():
+            return queryset.filter(company=self.value())
+        return queryset
+
 
 class ContactAdmin(admin.ModelAdmin):
     list_display = ('file_number', 'first_name', 'last_name', 'file_status', 'client_status')
-    list_filter = ('file_status', 'client_status', 'company')
-    filter_horizontal = ('linked_clients',)  # For easier many-to-many management
+    list_filter = ('file_status', 'client_status', CompanyListFilter)
+    # Linked clients are picked through the admin autocomplete view, which
+    # searches with get_search_results below instead of listing every contact
+    autocomplete_fields = ('linked_clients',)
+    search_fields = ('first_name', 'last_name', 'file_number', 'email', 'phone_number')
+    readonly_fields = ('linked_clients_count', 'linked_files_count')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Filter with the configured contacts.search backend (indexed) rather
+        than OR-ed icontains. Uncached and uncapped: the admin combines the
+        search with its own filters and paginates the result itself.
+        """
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return search_contacts(queryset, search_term), False
+
 
-admin.site.register(Contact, ContactAdmin)
\ No newline at end of file
+admin.site.register(Contact, ContactAdmin)
@@ -3,3 +3,10 @@ from django.apps import AppConfig
 class ContactsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'contacts'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import get_backend_name
+
+        # Fail at startup rather than on the first search
+        get_backend_name()
@@ -0,0 +1,109 @@
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+# A single change counter for the whole contacts table. Every cache entry
+# derived from contact data embeds it in its key, so bumping it invalidates
+# them all at once without having to enumerate keys.
+VERSION_KEY = 'contacts:version'
+
+# Unix time of the last bump, used as Last-Modified for conditional GETs
+CHANGED_AT_KEY = 'contacts:changed_at'
+
+
+def get_cache():
+    """Return the cache configured for contact data"""
+    return caches[settings.CONTACT_SEARCH['CACHE_ALIAS']]
+
+
+def _initial_version():
+    # Seeded from the clock so that an evicted counter never restarts at a
+    # value that was already handed out.
+    return int(time.time() * 1000)
+
+
+def get_contacts_version():
+    """Return the current contacts change counter"""
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _initial_version(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def get_contacts_changed_at():
+    """
+    Return when contact data last changed, or None if unknown (for example
+    after the cache was flushed).
+    """
+    changed_at = get_cache().get(CHANGED_AT_KEY)
+    if changed_at is None:
+        return None
+    return datetime.fromtimestamp(changed_at, tz=timezone.utc)
+
+
+def _bump():
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, _initial_version(), timeout=None)
+    cache.set(CHANGED_AT_KEY, time.time(), timeout=None)
+
+
+def bump_contacts_version():
+    """
+    Invalidate every versioned contacts cache entry.
+
+    The bump is deferred until the current transaction commits so that a
+    concurrent reader cannot repopulate the new version with rows that are
+    about to change.
+    """
+    transaction.on_commit(_bump)
+
+
+# Per-contact serialized representations (see api/caching.py) are keyed by
+# pk and a generation number. Single contacts are invalidated by deleting
+# their keys; bulk paths that cannot enumerate what they touched bump the
+# generation instead.
+REPRESENTATION_GENERATION_KEY = 'contacts:repr:generation'
+
+
+def get_representation_generation():
+    cache = get_cache()
+    generation = cache.get(REPRESENTATION_GENERATION_KEY)
+    if generation is None:
+        cache.add(REPRESENTATION_GENERATION_KEY, _initial_version(), timeout=None)
+        generation = cache.get(REPRESENTATION_GENERATION_KEY)
+    return generation
+
+
+def representation_key(pk, generation):
+    return f'contacts:repr:{generation}:{pk}'
+
+
+def invalidate_contacts(contact_ids):
+    """Drop the cached representations of ``contact_ids`` once the transaction commits"""
+    contact_ids = {pk for pk in contact_ids if pk is not None}
+    if not contact_ids:
+        return
+
+    def delete():
+        generation = get_representation_generation()
+        get_cache().delete_many([representation_key(pk, generation) for pk in contact_ids])
+    transaction.on_commit(delete)
+
+
+def invalidate_all_contacts():
+    """Drop every cached representation once the transaction commits"""
+    def bump():
+        cache = get_cache()
+        try:
+            cache.incr(REPRESENTATION_GENERATION_KEY)
+        except ValueError:
+            cache.set(REPRESENTATION_GENERATION_KEY, _initial_version(), timeout=None)
+    transaction.on_commit(bump)
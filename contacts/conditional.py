@@ -0,0 +1,107 @@
+import hashlib
+
+from django.contrib.messages import get_messages
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_cookie
+
+from addressbook.routers import reads_may_be_stale
+from .cache import get_contacts_changed_at, get_contacts_version
+from .models import RelationshipStats
+from .stats import SNAPSHOT_PK
+
+
+def _etag(request, *parts):
+    # The same data renders differently per URL (query string, pagination
+    # cursor), per negotiated format and per user, so all of them are part
+    # of the validator.
+    user = getattr(request, 'user', None)
+    key = ':'.join(str(part) for part in (
+        *parts,
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+        getattr(user, 'pk', None),
+    ))
+    return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+
+# Validators are only sent when the view reads from the primary or from
+# a replica that has caught up with the last contact write; otherwise a
+# client could cache stale data under the current version's validators.
+# Returning None leaves the response without conditional headers.
+
+def contacts_etag(request, *args, **kwargs):
+    """ETag from the contacts change counter; no database query"""
+    if reads_may_be_stale():
+        return None
+    return _etag(request, get_contacts_version())
+
+
+def contacts_last_modified(request, *args, **kwargs):
+    if reads_may_be_stale():
+        return None
+    return get_contacts_changed_at()
+
+
+def contact_page_etag(request, *args, **kwargs):
+    """
+    ETag for HTML contact pages: also keyed on the session, since the page
+    renders per-session state. No validator while flash messages are
+    pending, so they are rendered (and consumed) rather than left queued
+    behind a 304.
+    """
+    if reads_may_be_stale() or len(get_messages(request)):
+        return None
+    session = getattr(request, 'session', None)
+    return _etag(request, get_contacts_version(), getattr(session, 'session_key', None))
+
+
+def _snapshot_as_of(request):
+    # Read once per request; both validators need it
+    if not hasattr(request, '_snapshot_as_of'):
+        request._snapshot_as_of = RelationshipStats.objects.filter(
+            pk=SNAPSHOT_PK
+        ).values_list('as_of', flat=True).first()
+    return request._snapshot_as_of
+
+
+def report_etag(request, *args, **kwargs):
+    """
+    ETag for the relationship reports: the snapshot timestamp (which also
+    moves when refresh_relationship_stats rewrites it) plus the contacts
+    change counter for the contact data shown next to it
+    """
+    if reads_may_be_stale():
+        return None
+    return _etag(request, _snapshot_as_of(request), get_contacts_version())
+
+
+def report_last_modified(request, *args, **kwargs):
+    """
+    The later of the snapshot timestamp and the last contact write; none
+    when either is unknown
+    """
+    if reads_may_be_stale():
+        return None
+    as_of, changed_at = _snapshot_as_of(request), get_contacts_changed_at()
+    if as_of is None or changed_at is None:
+        return None
+    return max(as_of, changed_at)
+
+
+# Conditional GET for API views over contact data: a matching
+# If-None-Match or If-Modified-Since returns 304 before the view queries
+# or serializes anything. Not for HTML pages, which render per-session
+# state; contact_page_condition is the variant for those.
+contacts_condition = condition(
+    etag_func=contacts_etag, last_modified_func=contacts_last_modified
+)
+report_condition = condition(
+    etag_func=report_etag, last_modified_func=report_last_modified
+)
+
+# HTML contact pages: an ETag only (no Last-Modified, which cannot tell
+# sessions apart), and Vary: Cookie so shared caches keep one copy per
+# session. Applied with method_decorator to class-based views.
+contact_page_condition = [
+    vary_on_cookie, condition(etag_func=contact_page_etag),
+]
@@ -0,0 +1,413 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+
+from .cache import bump_contacts_version, invalidate_contacts
+from .importer import read_ndjson
+from .links import refresh_link_counts
+from .models import Contact
+from .stats import refresh_relationship_stats
+
+# Blocking keys: only contacts sharing at least one key are ever compared,
+# so the work grows with the number of near-duplicates rather than n^2.
+# ``{t}`` is the table alias. The phone key is the trailing national
+# digits (so +254712... and 0712... meet), the email key the local part
+# without dots or a +tag, and the name key the double metaphone codes of
+# first and last name in sorted order, which also matches swapped names.
+PHONE_DIGITS_SQL = r"regexp_replace({t}.phone_number, '\D', '', 'g')"
+BLOCKING_KEYS = {
+    'phone': (
+        f"right({PHONE_DIGITS_SQL}, %(phone_digits)s)",
+        f"length({PHONE_DIGITS_SQL}) >= %(phone_digits)s",
+    ),
+    'email': (
+        r"regexp_replace(regexp_replace(split_part({t}.email, '@', 1), '\+.*$', ''), '[._-]', '', 'g')",
+        "length(split_part({t}.email, '@', 1)) >= 3",
+    ),
+    'name': (
+        "least(dmetaphone({t}.first_name), dmetaphone({t}.last_name)) || ':' || "
+        "greatest(dmetaphone({t}.first_name), dmetaphone({t}.last_name))",
+        "dmetaphone({t}.first_name) <> '' AND dmetaphone({t}.last_name) <> ''",
+    ),
+}
+
+# Each signal scores 0..1 and is weighted; the weights sum to 1 so the
+# threshold reads as a fraction of a perfect match.
+WEIGHTS = {'phone': 0.35, 'email': 0.35, 'name': 0.3}
+
+KEYS_TABLE = 'contact_dedupe_keys'
+PAIRS_TABLE = 'contact_dedupe_pairs'
+MERGE_TABLE = 'contact_dedupe_merge'
+
+# Blank survivor fields are filled from the first duplicate that has them
+FILL_FIELDS = ('middle_name', 'company')
+
+
+def _key(kind, alias):
+    expression, condition = BLOCKING_KEYS[kind]
+    return expression.format(t=alias), condition.format(t=alias)
+
+
+# Name similarity of a pair, also matching swapped first and last names
+NAME_SIMILARITY_SQL = """
+    greatest(
+        similarity(x.first_name || ' ' || x.last_name, y.first_name || ' ' || y.last_name),
+        similarity(x.first_name || ' ' || x.last_name, y.last_name || ' ' || y.first_name)
+    )
+"""
+
+
+def _score_sql():
+    """Weighted pair score; ``n.name_similarity`` is NAME_SIMILARITY_SQL"""
+    phone_x, _ = _key('phone', 'x')
+    phone_y, phone_valid = _key('phone', 'y')
+    email_x, _ = _key('email', 'x')
+    email_y, _ = _key('email', 'y')
+    domain_x, domain_y = "split_part(x.email, '@', 2)", "split_part(y.email, '@', 2)"
+    return f"""
+        ({phone_x} = {phone_y} AND {phone_valid})::int * %(phone_weight)s
+        + CASE
+            WHEN {email_x} = {email_y} AND {domain_x} = {domain_y} THEN 1
+            WHEN {email_x} = {email_y} THEN 0.7
+            WHEN levenshtein(x.email, y.email) <= 2 THEN 0.8
+            ELSE 0
+          END * %(email_weight)s
+        + n.name_similarity * %(name_weight)s
+    """
+
+
+class DuplicateFinder:
+    """
+    Find likely duplicate contacts and group them into a merge plan.
+
+    Blocking keys are computed for every contact into a temporary table in
+    one pass; blocks with a single member or more than ``max_block_size``
+    members (shared office numbers, common names) are dropped, candidate
+    pairs are generated within the remaining blocks and scored in SQL. Pairs
+    at or above ``threshold`` whose names are at least
+    ``min_name_similarity`` alike (so a shared phone and email alone never
+    merge two people) are clustered with union-find, and each cluster keeps
+    the contact with the most links (then the oldest).
+    """
+
+    def __init__(self, threshold=None, max_block_size=None, min_name_similarity=None, progress=None):
+        config = settings.CONTACT_DEDUPE
+        self.threshold = config['THRESHOLD'] if threshold is None else threshold
+        self.max_block_size = max_block_size or config['MAX_BLOCK_SIZE']
+        self.min_name_similarity = (
+            config['MIN_NAME_SIMILARITY'] if min_name_similarity is None else min_name_similarity
+        )
+        self.params = {
+            'phone_digits': config['PHONE_DIGITS'],
+            'threshold': self.threshold,
+            'min_name_similarity': self.min_name_similarity,
+            'max_block_size': self.max_block_size,
+            **{f'{kind}_weight': weight for kind, weight in WEIGHTS.items()},
+        }
+        self.progress = progress or (lambda message: None)
+        self.timings = {}
+        self.counts = {'keys': 0, 'oversized_blocks': 0, 'candidates': 0, 'matches': 0}
+
+    def _timed(self, phase, started):
+        self.timings[phase] = self.timings.get(phase, 0) + time.monotonic() - started
+
+    def run(self):
+        """Return the merge plan: a list of {'survivor', 'duplicates', 'pairs'} dicts"""
+        with transaction.atomic(), connection.cursor() as cursor:
+            self._block(cursor)
+            self._candidates(cursor)
+            pairs = self._score()
+        return self._group(pairs)
+
+    def _block(self, cursor):
+        started = time.monotonic()
+        table = connection.ops.quote_name(Contact._meta.db_table)
+        selects = []
+        for kind in BLOCKING_KEYS:
+            expression, condition = _key(kind, 'c')
+            selects.append(
+                f"SELECT c.id, '{kind}'::text AS kind, {expression} AS key "
+                f"FROM {table} c WHERE {condition}"
+            )
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {KEYS_TABLE} ON COMMIT DROP AS "
+            + " UNION ALL ".join(selects),
+            self.params
+        )
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {KEYS_TABLE}_sizes ON COMMIT DROP AS "
+            f"SELECT kind, key, count(*) AS size FROM {KEYS_TABLE} GROUP BY kind, key"
+        )
+        cursor.execute(
+            f"SELECT count(*) FROM {KEYS_TABLE}_sizes WHERE size > %(max_block_size)s",
+            self.params
+        )
+        self.counts['oversized_blocks'] = cursor.fetchone()[0]
+        cursor.execute(
+            f"DELETE FROM {KEYS_TABLE} k USING {KEYS_TABLE}_sizes b "
+            f"WHERE k.kind = b.kind AND k.key = b.key "
+            f"AND (b.size = 1 OR b.size > %(max_block_size)s)",
+            self.params
+        )
+        cursor.execute(f"CREATE INDEX ON {KEYS_TABLE} (kind, key, id)")
+        cursor.execute(f"ANALYZE {KEYS_TABLE}")
+        cursor.execute(f"SELECT count(*) FROM {KEYS_TABLE}")
+        self.counts['keys'] = cursor.fetchone()[0]
+        self._timed('block', started)
+        self.progress(
+            f"Blocked: {self.counts['keys']} keys in shared blocks, "
+            f"{self.counts['oversized_blocks']} oversized blocks skipped"
+        )
+
+    def _candidates(self, cursor):
+        started = time.monotonic()
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {PAIRS_TABLE} ON COMMIT DROP AS "
+            f"SELECT DISTINCT a.id AS a_id, b.id AS b_id "
+            f"FROM {KEYS_TABLE} a JOIN {KEYS_TABLE} b "
+            f"ON a.kind = b.kind AND a.key = b.key AND a.id < b.id"
+        )
+        self.counts['candidates'] = cursor.rowcount
+        self._timed('candidates', started)
+        self.progress(f"Generated {self.counts['candidates']} candidate pairs")
+
+    def _score(self):
+        """Stream the scored pairs at or above the threshold"""
+        started = time.monotonic()
+        table = connection.ops.quote_name(Contact._meta.db_table)
+        pairs = []
+        with connection.chunked_cursor() as cursor:
+            cursor.execute(
+                f"SELECT p.a_id, p.b_id, s.score FROM {PAIRS_TABLE} p "
+                f"JOIN {table} x ON x.id = p.a_id "
+                f"JOIN {table} y ON y.id = p.b_id "
+                f"CROSS JOIN LATERAL (SELECT {NAME_SIMILARITY_SQL} AS name_similarity) n "
+                f"CROSS JOIN LATERAL (SELECT {_score_sql()} AS score) s "
+                f"WHERE s.score >= %(threshold)s "
+                f"AND n.name_similarity >= %(min_name_similarity)s",
+                self.params
+            )
+            for a_id, b_id, score in cursor:
+                pairs.append((a_id, b_id, round(float(score), 3)))
+        self.counts['matches'] = len(pairs)
+        self._timed('score', started)
+        self.progress(f"Scored: {len(pairs)} pairs at or above {self.threshold}")
+        return pairs
+
+    def _group(self, pairs):
+        started = time.monotonic()
+        parent = {}
+
+        def find(pk):
+            root = pk
+            while parent.setdefault(root, root) != root:
+                root = parent[root]
+            while parent[pk] != root:
+                parent[pk], pk = root, parent[pk]
+            return root
+
+        for a_id, b_id, _ in pairs:
+            parent[find(a_id)] = find(b_id)
+
+        clusters = {}
+        for pk in parent:
+            clusters.setdefault(find(pk), []).append(pk)
+        cluster_pairs = {}
+        for pair in pairs:
+            cluster_pairs.setdefault(find(pair[0]), []).append(list(pair))
+
+        links = {}
+        ids = list(parent)
+        for start in range(0, len(ids), 10000):
+            links.update(
+                (pk, clients + files)
+                for pk, clients, files in Contact.objects.filter(
+                    pk__in=ids[start:start + 10000]
+                ).values_list('pk', 'linked_clients_count', 'linked_files_count')
+            )
+
+        groups = []
+        for root, members in clusters.items():
+            members.sort(key=lambda pk: (-links.get(pk, 0), pk))
+            groups.append({
+                'survivor': members[0],
+                'duplicates': sorted(members[1:]),
+                'pairs': sorted(cluster_pairs[root]),
+            })
+        groups.sort(key=lambda group: group['survivor'])
+        self._timed('group', started)
+        return groups
+
+
+def write_plan(groups, stream):
+    """Write a merge plan as NDJSON, one group per line"""
+    for group in groups:
+        stream.write(json.dumps(group) + '\n')
+
+
+def read_plan(stream):
+    """Read a merge plan written by write_plan; raises ValueError on a bad line"""
+    groups = []
+    for group in read_ndjson(stream):
+        if isinstance(group, ValidationError):
+            raise ValueError(' '.join(group.messages))
+        groups.append(group)
+    return groups
+
+
+def _merge_map(groups):
+    """
+    Return {duplicate id: survivor id} for a plan, rejecting plans where a
+    contact is merged twice or is both a survivor and a duplicate.
+    """
+    mapping = {}
+    survivors = set()
+    for group in groups:
+        survivor = int(group['survivor'])
+        survivors.add(survivor)
+        for pk in map(int, group['duplicates']):
+            if pk == survivor or pk in mapping:
+                raise ValueError(f"Contact {pk} appears more than once in the merge plan")
+            mapping[pk] = survivor
+    both = survivors & mapping.keys()
+    if both:
+        raise ValueError(f"Contacts {sorted(both)} are both survivors and duplicates in the merge plan")
+    return mapping
+
+
+class DuplicateMerger:
+    """
+    Apply a merge plan in batches of ``batch_size`` groups.
+
+    Each batch runs in its own transaction: blank survivor fields are filled
+    from the duplicates, linked_clients edges in both directions are
+    repointed onto the survivors with one INSERT ... SELECT (self-links and
+    existing edges are skipped), the duplicates and their old edges are
+    deleted, and the link counters of every contact touched are refreshed.
+    Groups whose contacts no longer exist are skipped, so a plan can be
+    applied after other edits or re-applied safely.
+
+    Before a batch changes anything, each survivor and its duplicates are
+    written to ``backup`` as one NDJSON line: their full rows as they were
+    and their linked client and linked file ids, which is what undoing the
+    merge needs.
+    """
+
+    def __init__(self, batch_size=1000, progress=None, backup=None):
+        self.batch_size = batch_size
+        self.progress = progress or (lambda message: None)
+        self.backup = backup
+        self.timings = {}
+        self.counts = {'merged': 0, 'skipped': 0, 'links_repointed': 0}
+
+    def run(self, groups):
+        """Merge the plan's groups; returns the counts dict"""
+        started = time.monotonic()
+        mapping = list(_merge_map(groups).items())
+        for start in range(0, len(mapping), self.batch_size):
+            with transaction.atomic(), connection.cursor() as cursor:
+                self._merge_batch(cursor, mapping[start:start + self.batch_size])
+            self.progress(
+                f"Merged {self.counts['merged']} duplicates "
+                f"({self.counts['skipped']} skipped) of {len(mapping)}"
+            )
+        with transaction.atomic():
+            refresh_relationship_stats()
+        self.timings['merge'] = time.monotonic() - started
+        return self.counts
+
+    def _merge_batch(self, cursor, mapping):
+        table = connection.ops.quote_name(Contact._meta.db_table)
+        links = connection.ops.quote_name(Contact.linked_clients.through._meta.db_table)
+
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {MERGE_TABLE} "
+            f"(duplicate_id bigint PRIMARY KEY, survivor_id bigint NOT NULL) ON COMMIT DROP"
+        )
+        cursor.execute(
+            f"INSERT INTO {MERGE_TABLE} SELECT * FROM unnest(%s::bigint[], %s::bigint[])",
+            [[pk for pk, _ in mapping], [survivor for _, survivor in mapping]]
+        )
+        cursor.execute(
+            f"DELETE FROM {MERGE_TABLE} m WHERE "
+            f"NOT EXISTS (SELECT 1 FROM {table} c WHERE c.id = m.duplicate_id) OR "
+            f"NOT EXISTS (SELECT 1 FROM {table} c WHERE c.id = m.survivor_id)"
+        )
+        self.counts['skipped'] += cursor.rowcount
+        cursor.execute(f"SELECT duplicate_id, survivor_id FROM {MERGE_TABLE}")
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        duplicates = {pk for pk, _ in rows}
+        survivors = {pk for _, pk in rows}
+        if self.backup is not None:
+            self._backup(cursor)
+
+        # Neighbours of the duplicates lose (or move) an edge, so their
+        # counters are refreshed along with the survivors'
+        cursor.execute(
+            f"SELECT to_contact_id FROM {links} WHERE from_contact_id IN (SELECT duplicate_id FROM {MERGE_TABLE}) "
+            f"UNION SELECT from_contact_id FROM {links} WHERE to_contact_id IN (SELECT duplicate_id FROM {MERGE_TABLE})"
+        )
+        touched = (survivors | {pk for pk, in cursor.fetchall()}) - duplicates
+
+        for field in FILL_FIELDS:
+            column = connection.ops.quote_name(field)
+            cursor.execute(
+                f"UPDATE {table} s SET {column} = d.value, updated_at = now() FROM ("
+                f"SELECT DISTINCT ON (m.survivor_id) m.survivor_id, c.{column} AS value "
+                f"FROM {MERGE_TABLE} m JOIN {table} c ON c.id = m.duplicate_id "
+                f"WHERE coalesce(c.{column}, '') <> '' ORDER BY m.survivor_id, c.id"
+                f") d WHERE s.id = d.survivor_id AND coalesce(s.{column}, '') = ''"
+            )
+
+        cursor.execute(
+            f"INSERT INTO {links} (from_contact_id, to_contact_id) "
+            f"SELECT DISTINCT coalesce(f.survivor_id, l.from_contact_id), "
+            f"coalesce(t.survivor_id, l.to_contact_id) "
+            f"FROM {links} l "
+            f"LEFT JOIN {MERGE_TABLE} f ON f.duplicate_id = l.from_contact_id "
+            f"LEFT JOIN {MERGE_TABLE} t ON t.duplicate_id = l.to_contact_id "
+            f"WHERE (f.duplicate_id IS NOT NULL OR t.duplicate_id IS NOT NULL) "
+            f"AND coalesce(f.survivor_id, l.from_contact_id) <> coalesce(t.survivor_id, l.to_contact_id) "
+            f"ON CONFLICT DO NOTHING"
+        )
+        self.counts['links_repointed'] += cursor.rowcount
+        cursor.execute(
+            f"DELETE FROM {links} WHERE "
+            f"from_contact_id IN (SELECT duplicate_id FROM {MERGE_TABLE}) OR "
+            f"to_contact_id IN (SELECT duplicate_id FROM {MERGE_TABLE})"
+        )
+        cursor.execute(f"DELETE FROM {table} WHERE id IN (SELECT duplicate_id FROM {MERGE_TABLE})")
+        self.counts['merged'] += cursor.rowcount
+
+        refresh_link_counts(touched)
+        invalidate_contacts(duplicates)
+        bump_contacts_version()
+
+    def _backup(self, cursor):
+        """Write each group of the batch, as it is before merging, to the backup stream"""
+        table = connection.ops.quote_name(Contact._meta.db_table)
+        links = connection.ops.quote_name(Contact.linked_clients.through._meta.db_table)
+        cursor.execute(
+            f"SELECT m.survivor_id, c.id, to_jsonb(c), "
+            f"ARRAY(SELECT to_contact_id FROM {links} WHERE from_contact_id = c.id ORDER BY 1), "
+            f"ARRAY(SELECT from_contact_id FROM {links} WHERE to_contact_id = c.id ORDER BY 1) "
+            f"FROM (SELECT duplicate_id AS id, survivor_id FROM {MERGE_TABLE} "
+            f"UNION SELECT survivor_id, survivor_id FROM {MERGE_TABLE}) m "
+            f"JOIN {table} c ON c.id = m.id "
+            f"ORDER BY m.survivor_id, c.id"
+        )
+        groups = {}
+        for survivor_id, pk, row, linked_clients, linked_files in cursor.fetchall():
+            group = groups.setdefault(survivor_id, {'survivor': None, 'duplicates': []})
+            entry = {'contact': row, 'linked_clients': linked_clients, 'linked_files': linked_files}
+            if pk == survivor_id:
+                group['survivor'] = entry
+            else:
+                group['duplicates'].append(entry)
+        for group in groups.values():
+            self.backup.write(json.dumps(group) + '\n')
@@ -1,23 +1,52 @@
 from django import forms
+from django.urls import reverse_lazy
 from .models import Contact
 
+
+class ContactAutocompleteWidget(forms.SelectMultiple):
+    """
+    Multi-select that only renders the selected contacts as options.
+
+    Other contacts are found by the select2 ajax search in
+    contact_form.html against ``data-autocomplete-url`` (the API suggest
+    endpoint), so the page no longer grows with the contacts table.
+    """
+    def __init__(self, attrs=None):
+        attrs = {'data-autocomplete-url': reverse_lazy('contact-suggest'), **(attrs or {})}
+        super().__init__(attrs)
+
+    def optgroups(self, name, value, attrs=None):
+        ids = [pk for pk in value if str(pk).isdigit()]
+        contacts = Contact.objects.filter(pk__in=ids).only(
+            'id', 'first_name', 'last_name', 'file_number'
+        ) if ids else []
+        options = [
+            self.create_option(name, contact.pk, str(contact), True, index, attrs=attrs)
+            for index, contact in enumerate(contacts)
+        ]
+        return [(None, options, 0)]
+
+
 class ContactForm(forms.ModelForm):
     class Meta:
         model = Contact
         fields = '__all__'
         widgets = {
             'address': forms.Textarea(attrs={'rows': 3}),
-            'linked_clients': forms.SelectMultiple(attrs={'class': 'form-select'}),
+            'linked_clients': ContactAutocompleteWidget(attrs={'class': 'form-select'}),
         }
-    
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        
+
         # Make fields required
         self.fields['first_name'].required = True
         self.fields['last_name'].required = True
         self.fields['file_number'].required = True
-        
-        # If editing an existing contact, exclude it from linked clients
+
+        # If editing an existing contact, exclude it from linked clients.
+        # Submitted ids are checked against this queryset in one query by
+        # ModelMultipleChoiceField; it is never iterated for rendering.
         if self.instance and self.instance.pk:
-            self.fields['linked_clients'].queryset = Contact.objects.exclude(pk=self.instance.pk)
\ No newline at end of file
+            self.fields['linked_clients'].queryset = Contact.objects.exclude(pk=self.instance.pk)
+            self.fields['linked_clients'].widget.attrs['data-exclude'] = self.instance.pk
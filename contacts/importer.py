@@ -0,0 +1,334 @@
+import csv
+import io
+import json
+import time
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+
+from .cache import bump_contacts_version, invalidate_all_contacts
+from .links import refresh_link_counts
+from .models import Contact, normalize_email, normalize_phone
+from .stats import refresh_relationship_stats
+
+IMPORT_FIELDS = (
+    'first_name', 'middle_name', 'last_name', 'phone_number', 'email',
+    'address', 'file_status', 'file_number', 'client_status', 'company',
+)
+
+# Linked clients are referenced by file number, separated by ';' in CSV
+# input or given as a list in NDJSON input.
+LINKS_FIELD = 'linked_clients'
+LINK_SEPARATOR = ';'
+
+STAGING_TABLE = 'contact_import_staging'
+
+
+def read_csv(stream):
+    """Yield one dict per CSV row"""
+    yield from csv.DictReader(stream)
+
+
+def read_ndjson(stream):
+    """
+    Yield one dict per non-empty NDJSON line.
+
+    A line that is not a JSON object yields a ValidationError naming the
+    line instead, so ContactImporter reports it as an invalid row and
+    carries on with the rest of the file.
+    """
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield ValidationError(f"line {line_no}: invalid JSON ({exc})")
+            continue
+        if not isinstance(record, dict):
+            yield ValidationError(f"line {line_no}: expected a JSON object, got {type(record).__name__}")
+            continue
+        yield record
+
+
+READERS = {
+    'csv': read_csv,
+    'ndjson': read_ndjson,
+}
+
+
+def clean_import_row(raw):
+    """
+    Normalize and validate one input record.
+
+    Applies the same normalization as Contact.save() and the model field
+    validators. Returns (values, linked file numbers); raises
+    ValidationError with a readable message otherwise.
+    """
+    values = {}
+    errors = []
+    for name in IMPORT_FIELDS:
+        field = Contact._meta.get_field(name)
+        value = raw.get(name)
+        value = '' if value is None else str(value).strip()
+        if name == 'email':
+            value = normalize_email(value)
+        elif name == 'phone_number':
+            value = normalize_phone(value)
+        if not value:
+            if field.has_default():
+                value = field.get_default()
+            elif field.null:
+                values[name] = None
+                continue
+        try:
+            values[name] = field.clean(value, None)
+        except ValidationError as exc:
+            messages = dict.fromkeys(exc.messages)  # validators may repeat
+            errors.append(f"{name}: {' '.join(messages)}")
+    if errors:
+        raise ValidationError('; '.join(errors))
+
+    links = raw.get(LINKS_FIELD) or []
+    if isinstance(links, str):
+        links = links.split(LINK_SEPARATOR)
+    links = [str(ref).strip() for ref in links if str(ref).strip()]
+    return values, links
+
+
+def _copy_value(value):
+    """Render a value in COPY text format"""
+    if value is None:
+        return '\\N'
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+class ContactImporter:
+    """
+    Streaming bulk loader for contacts.
+
+    Rows are normalized in Python, streamed into a temporary staging table
+    with COPY in batches, then merged into contacts_contact with a handful
+    of set-based statements: dedupe by file number (last row wins), match
+    rows to existing contacts on file number, email or phone number, reject
+    rows that conflict with another contact, update the matched contacts,
+    insert the rest and resolve linked_clients references in bulk.
+    """
+
+    def __init__(self, batch_size=10000, error_writer=None, progress=None):
+        self.batch_size = batch_size
+        self.error_writer = error_writer
+        self.progress = progress or (lambda message: None)
+        self.timings = {}
+        self.counts = {
+            'read': 0, 'staged': 0, 'invalid': 0, 'rejected': 0,
+            'superseded': 0, 'created': 0, 'updated': 0, 'links': 0,
+            'unresolved_links': 0,
+        }
+
+    def _error(self, row_no, message):
+        if self.error_writer is not None:
+            self.error_writer.writerow([row_no, message])
+
+    def _timed(self, phase, started):
+        self.timings[phase] = self.timings.get(phase, 0) + time.monotonic() - started
+
+    def run(self, records):
+        """
+        Import an iterable of raw dicts; returns the counts dict.
+
+        ValidationError instances in ``records`` (unparseable input from a
+        reader) are counted and reported as invalid rows.
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            self._create_staging(cursor)
+            self._stage(cursor, records)
+            self._merge(cursor)
+            linked_ids = self._link(cursor)
+
+            started = time.monotonic()
+            linked_ids = list(linked_ids)
+            for start in range(0, len(linked_ids), self.batch_size):
+                refresh_link_counts(linked_ids[start:start + self.batch_size])
+            refresh_relationship_stats()
+            # Updated rows are not tracked individually
+            invalidate_all_contacts()
+            bump_contacts_version()
+            self._timed('finalize', started)
+        return self.counts
+
+    def _create_staging(self, cursor):
+        # Plain text columns: length and choice checks happen in
+        # clean_import_row, so COPY never fails on a single bad row.
+        columns = ', '.join(f'{name} text' for name in IMPORT_FIELDS)
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {STAGING_TABLE} ("
+            f"row_no bigint, {columns}, linked text, contact_id bigint"
+            f") ON COMMIT DROP"
+        )
+
+    def _stage(self, cursor, records):
+        started = time.monotonic()
+        columns = ', '.join(('row_no',) + IMPORT_FIELDS + ('linked',))
+        copy_sql = f"COPY {STAGING_TABLE} ({columns}) FROM STDIN"
+        buffer = io.StringIO()
+        pending = 0
+
+        for row_no, raw in enumerate(records, start=1):
+            self.counts['read'] += 1
+            try:
+                if isinstance(raw, ValidationError):
+                    raise raw
+                values, links = clean_import_row(raw)
+            except ValidationError as exc:
+                self.counts['invalid'] += 1
+                self._error(row_no, ' '.join(exc.messages))
+                continue
+            line = [row_no] + [values[name] for name in IMPORT_FIELDS]
+            line.append(LINK_SEPARATOR.join(links) or None)
+            buffer.write('\t'.join(_copy_value(value) for value in line) + '\n')
+            pending += 1
+
+            if pending >= self.batch_size:
+                self._flush(cursor, copy_sql, buffer, pending)
+                buffer = io.StringIO()
+                pending = 0
+        if pending:
+            self._flush(cursor, copy_sql, buffer, pending)
+        self._timed('stage', started)
+
+    def _flush(self, cursor, copy_sql, buffer, pending):
+        buffer.seek(0)
+        cursor.copy_expert(copy_sql, buffer)
+        self.counts['staged'] += pending
+        self.progress(
+            f"Staged {self.counts['staged']} rows "
+            f"({self.counts['invalid']} invalid) of {self.counts['read']} read"
+        )
+
+    def _reject(self, cursor, condition, reason, params=()):
+        """Report staged rows matching ``condition`` as errors and drop them"""
+        cursor.execute(
+            f"DELETE FROM {STAGING_TABLE} s WHERE {condition} RETURNING s.row_no",
+            params
+        )
+        rows = sorted(row_no for row_no, in cursor.fetchall())
+        for row_no in rows:
+            self._error(row_no, reason)
+        self.counts['rejected'] += len(rows)
+
+    def _merge(self, cursor):
+        started = time.monotonic()
+        table = connection.ops.quote_name(Contact._meta.db_table)
+
+        # Temporary tables are never auto-analyzed; without statistics the
+        # self-joins below are planned for an empty table
+        cursor.execute(f"ANALYZE {STAGING_TABLE}")
+
+        # Last occurrence of a file number in the input wins
+        cursor.execute(
+            f"DELETE FROM {STAGING_TABLE} a USING {STAGING_TABLE} b "
+            f"WHERE a.file_number = b.file_number AND a.row_no < b.row_no"
+        )
+        self.counts['superseded'] = cursor.rowcount
+
+        for key in ('email', 'phone_number'):
+            self._reject(
+                cursor,
+                f"s.{key} IN (SELECT {key} FROM {STAGING_TABLE} "
+                f"GROUP BY {key} HAVING count(*) > 1)",
+                f"duplicate {key} within the import"
+            )
+
+        # Rows are matched to existing contacts on file number, then on the
+        # (normalized) email, then on the phone number
+        for key in ('file_number', 'email', 'phone_number'):
+            cursor.execute(
+                f"UPDATE {STAGING_TABLE} s SET contact_id = c.id "
+                f"FROM {table} c WHERE s.contact_id IS NULL AND c.{key} = s.{key}"
+            )
+        self._reject(
+            cursor,
+            f"s.contact_id IN (SELECT contact_id FROM {STAGING_TABLE} "
+            f"GROUP BY contact_id HAVING count(*) > 1)",
+            "matches the same existing contact as another row"
+        )
+        for key in ('file_number', 'email', 'phone_number'):
+            self._reject(
+                cursor,
+                f"EXISTS (SELECT 1 FROM {table} c WHERE c.{key} = s.{key} "
+                f"AND c.id IS DISTINCT FROM s.contact_id)",
+                f"{key} belongs to another existing contact"
+            )
+
+        assignments = ', '.join(f'{name} = s.{name}' for name in IMPORT_FIELDS)
+        cursor.execute(
+            f"UPDATE {table} c SET {assignments}, updated_at = now() "
+            f"FROM {STAGING_TABLE} s WHERE c.id = s.contact_id"
+        )
+        self.counts['updated'] = cursor.rowcount
+
+        columns = ', '.join(IMPORT_FIELDS)
+        selected = ', '.join(f's.{name}' for name in IMPORT_FIELDS)
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}, created_at, updated_at, "
+            f"linked_clients_count, linked_files_count) "
+            f"SELECT {selected}, now(), now(), 0, 0 FROM {STAGING_TABLE} s "
+            f"WHERE s.contact_id IS NULL"
+        )
+        self.counts['created'] = cursor.rowcount
+        cursor.execute(
+            f"UPDATE {STAGING_TABLE} s SET contact_id = c.id "
+            f"FROM {table} c WHERE s.contact_id IS NULL AND c.file_number = s.file_number"
+        )
+        self._timed('merge', started)
+        self.progress(
+            f"Merged: {self.counts['created']} created, {self.counts['updated']} updated, "
+            f"{self.counts['rejected']} rejected"
+        )
+
+    def _link(self, cursor):
+        """Resolve linked_clients file numbers and insert links; returns touched ids"""
+        started = time.monotonic()
+        table = connection.ops.quote_name(Contact._meta.db_table)
+        links = connection.ops.quote_name(Contact.linked_clients.through._meta.db_table)
+
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {STAGING_TABLE}_links ON COMMIT DROP AS "
+            f"SELECT s.row_no, s.contact_id AS from_id, trim(ref) AS file_number, c.id AS to_id "
+            f"FROM {STAGING_TABLE} s "
+            f"CROSS JOIN LATERAL unnest(string_to_array(s.linked, %s)) AS ref "
+            f"LEFT JOIN {table} c ON c.file_number = trim(ref) "
+            f"WHERE s.linked IS NOT NULL",
+            [LINK_SEPARATOR]
+        )
+        cursor.execute(
+            f"SELECT row_no, file_number FROM {STAGING_TABLE}_links "
+            f"WHERE to_id IS NULL ORDER BY row_no"
+        )
+        for row_no, file_number in cursor.fetchall():
+            self.counts['unresolved_links'] += 1
+            self._error(row_no, f"linked client {file_number!r} not found (row imported)")
+
+        cursor.execute(
+            f"INSERT INTO {links} (from_contact_id, to_contact_id) "
+            f"SELECT DISTINCT from_id, to_id FROM {STAGING_TABLE}_links "
+            f"WHERE to_id IS NOT NULL AND to_id <> from_id "
+            f"ON CONFLICT DO NOTHING"
+        )
+        self.counts['links'] = cursor.rowcount
+
+        cursor.execute(
+            f"SELECT from_id FROM {STAGING_TABLE}_links WHERE to_id IS NOT NULL "
+            f"UNION SELECT to_id FROM {STAGING_TABLE}_links WHERE to_id IS NOT NULL"
+        )
+        touched = {pk for pk, in cursor.fetchall()}
+        self._timed('link', started)
+        return touched
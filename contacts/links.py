@@ -0,0 +1,81 @@
+from django.db import connection
+
+from .cache import bump_contacts_version, invalidate_contacts
+from .models import Contact
+from .stats import apply_stats_delta, link_state
+
+LinkedClients = Contact.linked_clients.through
+
+
+def refresh_link_counts(contact_ids):
+    """
+    Recompute linked_clients_count and linked_files_count for ``contact_ids``.
+
+    The counts are taken from the through table in a single UPDATE, so they
+    are exact rather than incremented and cannot drift under concurrent
+    link changes. The rows are locked (in id order) by the same statement
+    that returns their previous counts, so the statistics delta is exact
+    too.
+    """
+    contact_ids = sorted({pk for pk in contact_ids if pk is not None})
+    if not contact_ids:
+        return
+    # Link changes alter the linked_clients ids and counters of every
+    # contact passed here, so their cached representations go too.
+    invalidate_contacts(contact_ids)
+    table = connection.ops.quote_name(Contact._meta.db_table)
+    links = connection.ops.quote_name(LinkedClients._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} c SET "
+            f"linked_clients_count = (SELECT count(*) FROM {links} l WHERE l.from_contact_id = c.id), "
+            f"linked_files_count = (SELECT count(*) FROM {links} l WHERE l.to_contact_id = c.id) "
+            f"FROM (SELECT id, linked_clients_count, linked_files_count FROM {table} "
+            f"WHERE id = ANY(%s) ORDER BY id FOR UPDATE) old "
+            f"WHERE c.id = old.id "
+            f"RETURNING old.linked_clients_count, old.linked_files_count, "
+            f"c.linked_clients_count, c.linked_files_count",
+            [contact_ids]
+        )
+        rows = cursor.fetchall()
+
+    # Keep the relationship statistics snapshot in step
+    linked = with_links = 0
+    for old_clients, old_files, new_clients, new_files in rows:
+        had_clients, had_links = link_state(old_clients, old_files)
+        has_clients, has_links = link_state(new_clients, new_files)
+        linked += has_clients - had_clients
+        with_links += has_links - had_links
+    apply_stats_delta(linked=linked, with_links=with_links, refresh_top=True)
+
+
+def linked_contact_ids(contact_ids):
+    """Return the ids linked to ``contact_ids`` in either direction"""
+    rows = LinkedClients.objects.filter(
+        from_contact__in=contact_ids
+    ).values_list('to_contact', flat=True).union(
+        LinkedClients.objects.filter(
+            to_contact__in=contact_ids
+        ).values_list('from_contact', flat=True)
+    )
+    return set(rows)
+
+
+def add_links(pairs, batch_size=1000):
+    """
+    Insert (from_contact_id, to_contact_id) links in bulk.
+
+    bulk_create does not send m2m_changed, so the counters and the contacts
+    cache version are maintained here. Existing links and self-links are
+    skipped.
+    """
+    pairs = {(src, dst) for src, dst in pairs if src != dst}
+    if not pairs:
+        return
+    LinkedClients.objects.bulk_create(
+        [LinkedClients(from_contact_id=src, to_contact_id=dst) for src, dst in pairs],
+        batch_size=batch_size,
+        ignore_conflicts=True
+    )
+    refresh_link_counts({pk for pair in pairs for pk in pair})
+    bump_contacts_version()
@@ -0,0 +1,95 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from addressbook.routers import reads_may_be_stale
+from .cache import get_cache, get_contacts_version
+from .models import Contact, normalize_email, normalize_phone
+
+# Reverse lookup keys: the model field and the canonicalization Contact.save()
+# applies to it, so a lookup is a single equality probe on the unique index.
+LOOKUP_FIELDS = {
+    'phone': ('phone_number', normalize_phone),
+    'email': ('email', normalize_email),
+}
+
+LOOKUP_VALUES = (
+    'id', 'first_name', 'last_name', 'file_number', 'phone_number', 'email',
+    'company', 'client_status', 'file_status',
+)
+
+# Cached in place of a contact when nothing matched (None means "not cached")
+NOT_FOUND = 'not-found'
+
+
+class LocalLRU:
+    """
+    Small thread-safe in-process LRU in front of the shared cache.
+
+    Keys embed the contacts version, so entries are never stale; superseded
+    versions simply age out.
+    """
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_cache = LocalLRU(settings.CONTACT_LOOKUP['LOCAL_MAX_ENTRIES'])
+
+
+def canonicalize(kind, value):
+    """Return the stored form of a phone number or email, or '' if nothing is left"""
+    _, normalize = LOOKUP_FIELDS[kind]
+    return normalize(value or '')
+
+
+def lookup_contact(kind, value):
+    """
+    Return the contact whose phone number or email (``kind``) matches
+    ``value`` as a compact dict, or None.
+
+    Results, including misses, are cached under the contacts version in an
+    in-process LRU and in the shared cache, so any contact change makes
+    them unreachable. Misses are kept for a shorter time.
+    """
+    field, _ = LOOKUP_FIELDS[kind]
+    value = canonicalize(kind, value)
+    if not value:
+        return None
+
+    digest = hashlib.md5(value.encode()).hexdigest()
+    key = f'contacts:lookup:{get_contacts_version()}:{kind}:{digest}'
+    result = local_cache.get(key)
+    if result is None:
+        cache = get_cache()
+        result = cache.get(key)
+        if result is None:
+            result = Contact.objects.filter(**{field: value}).values(*LOOKUP_VALUES).first() or NOT_FOUND
+            if reads_may_be_stale():
+                return None if result == NOT_FOUND else result
+            config = settings.CONTACT_LOOKUP
+            timeout = config['NEGATIVE_TIMEOUT'] if result == NOT_FOUND else config['TIMEOUT']
+            cache.set(key, result, timeout)
+        local_cache.set(key, result)
+    return None if result == NOT_FOUND else result
@@ -0,0 +1,226 @@
+import json
+import random
+import statistics
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max, Min
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from contacts.cache import get_cache
+from contacts.models import Contact
+
+BENCHMARK_USER = 'benchmark'
+BENCHMARK_PREFIX = 'BENCH'
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Scenarios:
+    """
+    Request factories for each benchmarked endpoint.
+
+    Each scenario returns (method, path, payload) for one request, drawing
+    ids and search terms from a sample of the current dataset.
+    """
+    def __init__(self, rng, sample_size=200):
+        self.rng = rng
+        self.ids = self._sample_ids(sample_size)
+        self.linked_ids = list(
+            Contact.objects.filter(linked_clients_count__gt=0)
+            .order_by('-linked_clients_count')
+            .values_list('pk', flat=True)[:sample_size]
+        ) or self.ids
+        rows = Contact.objects.filter(pk__in=self.ids).values_list('last_name', 'first_name', 'phone_number')
+        self.terms = [f"{first} {last}" for last, first, _ in rows]
+        self.prefixes = [last[:3] for last, _, _ in rows]
+        self.phones = [phone for _, _, phone in rows]
+        self.created = []
+        self.counter = 0
+
+    def _sample_ids(self, size):
+        # Random probes into the id range; avoids ORDER BY random() on big tables
+        bounds = Contact.objects.aggregate(low=Min('id'), high=Max('id'))
+        if bounds['low'] is None:
+            raise CommandError("No contacts to benchmark; run seed_contacts first")
+        ids = set()
+        for _ in range(size):
+            probe = self.rng.randint(bounds['low'], bounds['high'])
+            pk = Contact.objects.filter(pk__gte=probe).order_by('pk').values_list('pk', flat=True).first()
+            if pk is not None:
+                ids.add(pk)
+        return sorted(ids)
+
+    def list(self):
+        return 'get', '/api/contacts/', None
+
+    def list_fields(self):
+        return 'get', '/api/contacts/?fields=id,first_name,last_name,file_number', None
+
+    def search(self):
+        return 'get', '/api/contacts/', {'search': self.rng.choice(self.terms)}
+
+    def suggest(self):
+        return 'get', '/api/contacts/suggest/', {'q': self.rng.choice(self.prefixes)}
+
+    def lookup(self):
+        # Formatted the way a carrier might send it
+        phone = self.rng.choice(self.phones)
+        return 'get', '/api/contacts/lookup/', {'phone': f"{phone[:-7]} ({phone[-7:-4]}) {phone[-4:]}"}
+
+    def detail(self):
+        return 'get', f'/api/contacts/{self.rng.choice(self.ids)}/', None
+
+    def linked_clients(self):
+        return 'get', f'/api/contacts/{self.rng.choice(self.linked_ids)}/linked-clients/', None
+
+    def linked_files(self):
+        return 'get', f'/api/contacts/{self.rng.choice(self.ids)}/linked-files/', None
+
+    def network(self):
+        return 'get', f'/api/contacts/{self.rng.choice(self.linked_ids)}/network/', {'depth': 2}
+
+    def report(self):
+        return 'get', '/api/contacts/relationship-report/', None
+
+    def report_html(self):
+        return 'get', '/reports/links/', None
+
+    def create(self):
+        self.counter += 1
+        n = f"{int(time.time()) % 10 ** 8:08d}{self.counter:06d}"
+        return 'post', '/api/contacts/', {
+            'first_name': 'Bench',
+            'last_name': 'Mark',
+            'phone_number': f"+9{n[-12:]}",
+            'email': f"bench{n}@example.com",
+            'address': '1 Benchmark Way',
+            'file_number': f"{BENCHMARK_PREFIX}{n}",
+            'linked_clients': self.rng.sample(self.ids, min(2, len(self.ids))),
+        }
+
+    def update(self):
+        pk = self.rng.choice(self.created or self.ids)
+        return 'patch', f'/api/contacts/{pk}/', {'company': f"Bench {self.rng.randint(1, 1000)}"}
+
+    NAMES = (
+        'list', 'list_fields', 'search', 'suggest', 'lookup', 'detail', 'linked_clients',
+        'linked_files', 'network', 'report', 'report_html', 'create', 'update',
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the contact endpoints in-process against the configured "
+        "database and report latency percentiles and query counts. Seed a "
+        "dataset first (seed_contacts --count 10000/100000/1000000)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenarios',
+            default=','.join(Scenarios.NAMES),
+            help=f"Comma-separated scenarios (default: all of {', '.join(Scenarios.NAMES)})"
+        )
+        parser.add_argument('--iterations', type=int, default=50, help="Measured requests per scenario")
+        parser.add_argument('--warmup', type=int, default=5, help="Unmeasured requests per scenario")
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help="Clear the cache before every request (measures uncached paths)"
+        )
+        parser.add_argument('--seed', type=int, default=0, help="Random seed for ids and terms")
+        parser.add_argument('--json', dest='json_path', help="Also write the results to this file")
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError("--iterations must be positive")
+        names = [name.strip() for name in options['scenarios'].split(',') if name.strip()]
+        unknown = set(names) - set(Scenarios.NAMES)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+        user, _ = get_user_model().objects.get_or_create(username=BENCHMARK_USER)
+        token, _ = Token.objects.get_or_create(user=user)
+        # A failing request is counted as an error rather than ending the run
+        client = APIClient(raise_request_exception=False)
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        scenarios = Scenarios(random.Random(options['seed']))
+        total_rows = Contact.objects.count()
+
+        # Run against the real settings except for what would distort the
+        # numbers: host checks, HTTPS redirects and rate limiting.
+        overrides = override_settings(
+            ALLOWED_HOSTS=['testserver', *settings.ALLOWED_HOSTS],
+            SECURE_SSL_REDIRECT=False,
+        )
+        results = []
+        try:
+            with overrides, mock.patch('rest_framework.views.APIView.get_throttles', return_value=[]):
+                for name in names:
+                    results.append(self.run_scenario(client, scenarios, name, options))
+        finally:
+            Contact.objects.filter(file_number__startswith=BENCHMARK_PREFIX).delete()
+
+        self.report(results, total_rows)
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as stream:
+                json.dump({'rows': total_rows, 'results': results}, stream, indent=2)
+
+    def run_scenario(self, client, scenarios, name, options):
+        latencies, queries, errors = [], [], 0
+        for iteration in range(options['warmup'] + options['iterations']):
+            method, path, payload = getattr(scenarios, name)()
+            if options['cold']:
+                get_cache().clear()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                if method == 'get':
+                    response = client.get(path, payload)
+                else:
+                    response = getattr(client, method)(path, payload, format='json')
+                elapsed = time.perf_counter() - started
+            if name == 'create' and response.status_code == 201:
+                scenarios.created.append(response.data['id'])
+            if iteration < options['warmup']:
+                continue
+            latencies.append(elapsed * 1000)
+            queries.append(len(captured))
+            if response.status_code >= 400:
+                errors += 1
+
+        return {
+            'scenario': name,
+            'requests': len(latencies),
+            'errors': errors,
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'max_ms': round(max(latencies), 2),
+            'mean_queries': round(statistics.mean(queries), 1),
+            'max_queries': max(queries),
+        }
+
+    def report(self, results, total_rows):
+        self.stdout.write(f"{total_rows} contacts, database {connection.settings_dict['NAME']}")
+        header = f"{'scenario':<16}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'queries':>10}{'errors':>8}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for result in results:
+            line = (
+                f"{result['scenario']:<16}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+                f"{result['p99_ms']:>10.2f}{result['max_ms']:>10.2f}"
+                f"{result['mean_queries']:>10.1f}{result['errors']:>8}"
+            )
+            style = self.style.ERROR if result['errors'] else (lambda text: text)
+            self.stdout.write(style(line))
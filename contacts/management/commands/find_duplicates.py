@@ -0,0 +1,111 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from contacts.dedupe import DuplicateFinder, DuplicateMerger, read_plan, write_plan
+
+
+class Command(BaseCommand):
+    help = (
+        "Find near-duplicate contacts (reformatted phone numbers, swapped "
+        "names, email typos) using blocking keys and scored pairs, and write "
+        "or apply a merge plan. Merging repoints linked_clients edges onto "
+        "the surviving contact and deletes the duplicates, after writing "
+        "their rows and links to --backup."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            help="Minimum pair score between 0 and 1 (default: CONTACT_DEDUPE['THRESHOLD'])"
+        )
+        parser.add_argument(
+            '--min-name-similarity',
+            type=float,
+            help="Minimum name similarity between 0 and 1 for a pair to match "
+                 "(default: CONTACT_DEDUPE['MIN_NAME_SIMILARITY'])"
+        )
+        parser.add_argument(
+            '--max-block-size',
+            type=int,
+            help="Skip blocking keys shared by more contacts than this "
+                 "(default: CONTACT_DEDUPE['MAX_BLOCK_SIZE'])"
+        )
+        parser.add_argument('--output', help="Write the merge plan as NDJSON to this file, or '-' for stdout")
+        parser.add_argument('--plan', help="Apply this merge plan instead of searching for duplicates")
+        parser.add_argument('--apply', action='store_true', help="Merge the duplicates that were found")
+        parser.add_argument(
+            '--backup',
+            help="Required when merging: write the merged contacts' rows and links "
+                 "as NDJSON to this file before changing them, so a merge can be undone"
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Duplicates merged per transaction (default: 1000)"
+        )
+
+    def handle(self, *args, **options):
+        threshold = options['threshold']
+        if threshold is not None and not 0 < threshold <= 1:
+            raise CommandError("--threshold must be between 0 and 1")
+        min_name_similarity = options['min_name_similarity']
+        if min_name_similarity is not None and not 0 <= min_name_similarity <= 1:
+            raise CommandError("--min-name-similarity must be between 0 and 1")
+        if (options['apply'] or options['plan']) and not options['backup']:
+            raise CommandError("Merging requires --backup")
+        # Progress goes to stderr when the plan is written to stdout
+        progress = self.stderr.write if options['output'] == '-' else self.stdout.write
+
+        if options['plan']:
+            try:
+                with open(options['plan'], encoding='utf-8') as stream:
+                    groups = read_plan(stream)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read {options['plan']}: {exc}")
+            self.merge(groups, options, progress)
+            return
+
+        finder = DuplicateFinder(
+            threshold=threshold,
+            max_block_size=options['max_block_size'],
+            min_name_similarity=min_name_similarity,
+            progress=progress
+        )
+        started = time.monotonic()
+        groups = finder.run()
+        elapsed = time.monotonic() - started
+
+        if options['output'] == '-':
+            write_plan(groups, sys.stdout)
+        elif options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                write_plan(groups, stream)
+
+        duplicates = sum(len(group['duplicates']) for group in groups)
+        phases = ', '.join(f"{phase} {seconds:.2f}s" for phase, seconds in finder.timings.items())
+        progress(self.style.SUCCESS(
+            f"Found {duplicates} duplicates in {len(groups)} groups from "
+            f"{finder.counts['candidates']} candidate pairs in {elapsed:.2f}s ({phases})."
+        ))
+        if options['apply']:
+            self.merge(groups, options, progress)
+
+    def merge(self, groups, options, progress):
+        try:
+            backup = open(options['backup'], 'w', encoding='utf-8')
+        except OSError as exc:
+            raise CommandError(f"Cannot write {options['backup']}: {exc}")
+        with backup:
+            merger = DuplicateMerger(batch_size=options['batch_size'], progress=progress, backup=backup)
+            try:
+                counts = merger.run(groups)
+            except (KeyError, TypeError, ValueError) as exc:
+                raise CommandError(f"Invalid merge plan: {exc}")
+        progress(self.style.SUCCESS(
+            f"Merged {counts['merged']} duplicates ({counts['skipped']} skipped), "
+            f"{counts['links_repointed']} links repointed in {merger.timings['merge']:.2f}s."
+        ))
@@ -0,0 +1,146 @@
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from .benchmark import percentile
+
+# Sync (DRF) and async (ASGI) variants of the same reads, so one run shows
+# both against whichever server is listening at --url
+PATHS = {
+    'search': '/api/search/?q=smith',
+    'async_search': '/api/async/search/?q=smith',
+    'suggest': '/api/contacts/suggest/?q=smi',
+    'async_suggest': '/api/async/suggest/?q=smi',
+    'report': '/api/contacts/relationship-report/',
+    'async_report': '/api/async/relationship-report/',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Closed-loop HTTP load test: N concurrent clients hit a running "
+        "server for a fixed duration and the throughput and latency "
+        "percentiles are reported. Run it against the gunicorn (WSGI) and "
+        "the uvicorn (ASGI) deployments to compare them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://localhost:8000', help="Server base URL")
+        parser.add_argument(
+            '--paths',
+            default=','.join(PATHS),
+            help=f"Comma-separated names ({', '.join(PATHS)}) or raw paths starting with '/'"
+        )
+        parser.add_argument('--concurrency', type=int, default=50, help="Concurrent clients")
+        parser.add_argument('--duration', type=float, default=20, help="Seconds per path")
+        parser.add_argument('--timeout', type=float, default=30, help="Per-request timeout in seconds")
+        parser.add_argument(
+            '--sample-connections',
+            action='store_true',
+            help="Sample pg_stat_activity once a second to report the server's "
+                 "database connection count (needs access to the same database)"
+        )
+        parser.add_argument('--json', dest='json_path', help="Also write the results to this file")
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError("--concurrency must be positive")
+        targets = []
+        for name in filter(None, (part.strip() for part in options['paths'].split(','))):
+            if name.startswith('/'):
+                targets.append((name, name))
+            elif name in PATHS:
+                targets.append((name, PATHS[name]))
+            else:
+                raise CommandError(f"Unknown path name: {name}")
+
+        results = [self.run_path(options, name, path) for name, path in targets]
+        self.report(options, results)
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as stream:
+                json.dump({
+                    'url': options['url'],
+                    'concurrency': options['concurrency'],
+                    'results': results,
+                }, stream, indent=2)
+
+    def run_path(self, options, name, path):
+        url = options['url'].rstrip('/') + path
+        deadline = time.monotonic() + options['duration']
+        latencies, errors = [], 0
+        lock = threading.Lock()
+
+        def client():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(url, timeout=options['timeout']) as response:
+                        response.read()
+                    failed = False
+                except (urllib.error.URLError, OSError):
+                    failed = True
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    latencies.append(elapsed)
+                    errors += failed
+
+        connection_counts = []
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            for _ in range(options['concurrency']):
+                pool.submit(client)
+            if options['sample_connections']:
+                while time.monotonic() < deadline:
+                    connection_counts.append(self.count_connections())
+                    time.sleep(1)
+        elapsed = time.monotonic() - started
+
+        if not latencies:
+            raise CommandError(f"No requests completed against {url}")
+        result = {
+            'name': name,
+            'path': path,
+            'requests': len(latencies),
+            'errors': errors,
+            'rps': round(len(latencies) / elapsed, 1),
+            'mean_ms': round(statistics.mean(latencies), 2),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+        }
+        if connection_counts:
+            result['db_connections_min'] = min(connection_counts)
+            result['db_connections_max'] = max(connection_counts)
+        return result
+
+    def count_connections(self):
+        """Backends connected to our database, excluding this process's own"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM pg_stat_activity "
+                "WHERE datname = current_database() AND pid <> pg_backend_pid()"
+            )
+            return cursor.fetchone()[0]
+
+    def report(self, options, results):
+        self.stdout.write(f"{options['url']}, {options['concurrency']} concurrent clients")
+        header = f"{'path':<16}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for result in results:
+            line = (
+                f"{result['name']:<16}{result['rps']:>10.1f}{result['p50_ms']:>10.2f}"
+                f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['errors']:>8}"
+            )
+            if 'db_connections_max' in result:
+                line += f"  db connections {result['db_connections_min']}-{result['db_connections_max']}"
+            style = self.style.ERROR if result['errors'] else (lambda text: text)
+            self.stdout.write(style(line))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max, Min
+
+from contacts.models import Contact
+
+
+class Command(BaseCommand):
+    help = "Backfill Contact.search_vector for existing rows in primary key batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help="Number of primary keys covered by each UPDATE (default: 5000)"
+        )
+        parser.add_argument(
+            '--only-missing',
+            action='store_true',
+            help="Only rebuild rows whose search_vector is NULL"
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        bounds = Contact.objects.aggregate(low=Min('id'), high=Max('id'))
+        if bounds['low'] is None:
+            self.stdout.write("No contacts to process.")
+            return
+
+        table = connection.ops.quote_name(Contact._meta.db_table)
+        # Assigning the column fires the search_vector trigger, which
+        # recomputes the weighted vector from the row itself.
+        sql = f"UPDATE {table} SET search_vector = NULL WHERE id >= %s AND id < %s"
+        if options['only_missing']:
+            sql += " AND search_vector IS NULL"
+
+        updated = 0
+        for start in range(bounds['low'], bounds['high'] + 1, batch_size):
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(sql, [start, start + batch_size])
+                updated += cursor.rowcount
+            self.stdout.write(f"Processed ids < {start + batch_size} ({updated} rows updated)")
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt search vectors for {updated} contacts."))
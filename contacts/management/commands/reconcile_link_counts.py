@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max, Min
+
+from contacts.cache import bump_contacts_version, invalidate_all_contacts
+from contacts.models import Contact
+from contacts.stats import refresh_relationship_stats
+
+
+class Command(BaseCommand):
+    help = "Repair drift in Contact.linked_clients_count / linked_files_count"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help="Number of primary keys checked by each UPDATE (default: 10000)"
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        bounds = Contact.objects.aggregate(low=Min('id'), high=Max('id'))
+        if bounds['low'] is None:
+            self.stdout.write("No contacts to process.")
+            return
+
+        qn = connection.ops.quote_name
+        table = qn(Contact._meta.db_table)
+        links = qn(Contact.linked_clients.through._meta.db_table)
+        # Only rows whose stored counts differ from the through table are
+        # written, so the rowcount is the number of repaired contacts.
+        sql = f"""
+            UPDATE {table} c
+            SET linked_clients_count = coalesce(f.total, 0),
+                linked_files_count = coalesce(t.total, 0)
+            FROM {table} ids
+            LEFT JOIN (
+                SELECT from_contact_id AS id, count(*) AS total FROM {links}
+                WHERE from_contact_id >= %(low)s AND from_contact_id < %(high)s
+                GROUP BY from_contact_id
+            ) f ON f.id = ids.id
+            LEFT JOIN (
+                SELECT to_contact_id AS id, count(*) AS total FROM {links}
+                WHERE to_contact_id >= %(low)s AND to_contact_id < %(high)s
+                GROUP BY to_contact_id
+            ) t ON t.id = ids.id
+            WHERE c.id = ids.id
+              AND ids.id >= %(low)s AND ids.id < %(high)s
+              AND (c.linked_clients_count <> coalesce(f.total, 0)
+                   OR c.linked_files_count <> coalesce(t.total, 0))
+        """
+
+        repaired = 0
+        for low in range(bounds['low'], bounds['high'] + 1, batch_size):
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(sql, {'low': low, 'high': low + batch_size})
+                repaired += cursor.rowcount
+
+        if repaired:
+            invalidate_all_contacts()
+            bump_contacts_version()
+            # The snapshot was built from the drifted counters
+            refresh_relationship_stats()
+        self.stdout.write(self.style.SUCCESS(f"Repaired link counts on {repaired} contacts."))
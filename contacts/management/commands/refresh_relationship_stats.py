@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from contacts.stats import fold_stats_deltas, refresh_relationship_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Update the relationship statistics snapshot. Writers only append "
+        "to a delta log, so run with --deltas on a schedule (or --every N) "
+        "to fold it in; without --deltas the snapshot is rebuilt from scratch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--deltas',
+            action='store_true',
+            help="Fold the pending deltas in instead of rebuilding"
+        )
+        parser.add_argument(
+            '--every',
+            type=float,
+            help="Keep running, updating the snapshot every N seconds"
+        )
+
+    def handle(self, *args, **options):
+        if options['every'] is not None and options['every'] <= 0:
+            raise CommandError("--every must be positive")
+        while True:
+            if options['deltas']:
+                folded = fold_stats_deltas()
+                if folded:
+                    self.stdout.write(f"Folded {folded} relationship statistics deltas.")
+            else:
+                stats = refresh_relationship_stats()
+                self.stdout.write(self.style.SUCCESS(
+                    f"Relationship statistics refreshed as of {stats.as_of.isoformat()}: "
+                    f"{stats.total_contacts} contacts, {stats.linked_contacts} linked."
+                ))
+            if options['every'] is None:
+                break
+            time.sleep(options['every'])
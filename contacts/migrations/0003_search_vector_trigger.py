@@ -0,0 +1,50 @@
+from django.db import migrations
+
+# Keeps contacts_contact.search_vector in sync inside the database so that
+# every write path (Model.save, QuerySet.update, bulk_create, raw SQL and
+# COPY) maintains it. Weights: A = name and file number, B = email and phone,
+# C = company, D = address. Existing rows are filled by the
+# rebuild_search_vectors management command.
+CREATE_TRIGGER_SQL = r"""
+CREATE OR REPLACE FUNCTION contacts_contact_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple',
+            coalesce(NEW.first_name, '') || ' ' ||
+            coalesce(NEW.middle_name, '') || ' ' ||
+            coalesce(NEW.last_name, '') || ' ' ||
+            coalesce(NEW.file_number, '')), 'A') ||
+        setweight(to_tsvector('simple',
+            coalesce(NEW.email, '') || ' ' ||
+            split_part(coalesce(NEW.email, ''), '@', 1) || ' ' ||
+            regexp_replace(coalesce(NEW.phone_number, ''), '\D', '', 'g')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(NEW.company, '')), 'C') ||
+        setweight(to_tsvector('simple', coalesce(NEW.address, '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS contacts_contact_search_vector_trigger ON contacts_contact;
+CREATE TRIGGER contacts_contact_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF
+        first_name, middle_name, last_name, file_number,
+        email, phone_number, company, address, search_vector
+    ON contacts_contact
+    FOR EACH ROW EXECUTE FUNCTION contacts_contact_search_vector_update();
+"""
+
+DROP_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS contacts_contact_search_vector_trigger ON contacts_contact;
+DROP FUNCTION IF EXISTS contacts_contact_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0002_alter_contact_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_TRIGGER_SQL, DROP_TRIGGER_SQL),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0005_prefix_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='contact',
+            options={'ordering': ['last_name', 'first_name', 'id'], 'verbose_name': 'contact', 'verbose_name_plural': 'contacts'},
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['last_name', 'first_name', 'id'], name='contacts_co_last_na_75f66c_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:11
+
+from django.db import migrations, models
+
+BACKFILL_COUNTS_SQL = """
+UPDATE contacts_contact c
+SET linked_clients_count = counts.clients, linked_files_count = counts.files
+FROM (
+    SELECT id,
+        (SELECT count(*) FROM contacts_contact_linked_clients l WHERE l.from_contact_id = c2.id) AS clients,
+        (SELECT count(*) FROM contacts_contact_linked_clients l WHERE l.to_contact_id = c2.id) AS files
+    FROM contacts_contact c2
+) counts
+WHERE counts.id = c.id AND (counts.clients > 0 OR counts.files > 0);
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0006_keyset_pagination'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contact',
+            name='linked_clients_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='linked clients count'),
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='linked_files_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='linked files count'),
+        ),
+        migrations.RunSQL(BACKFILL_COUNTS_SQL, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['linked_clients_count'], name='contacts_co_linked__8ab473_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['linked_files_count'], name='contacts_co_linked__c32f5d_idx'),
+        ),
+    ]
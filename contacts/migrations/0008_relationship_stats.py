@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0007_link_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelationshipStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_contacts', models.PositiveIntegerField(default=0, verbose_name='total contacts')),
+                ('linked_contacts', models.PositiveIntegerField(default=0, verbose_name='contacts with linked clients')),
+                ('contacts_with_links', models.PositiveIntegerField(default=0, verbose_name='contacts with links in either direction')),
+                ('top_files', models.JSONField(default=list, verbose_name='top files')),
+                ('top_clients', models.JSONField(default=list, verbose_name='top clients')),
+                ('as_of', models.DateTimeField(verbose_name='as of')),
+            ],
+            options={
+                'verbose_name': 'relationship statistics',
+                'verbose_name_plural': 'relationship statistics',
+            },
+        ),
+    ]
@@ -0,0 +1,14 @@
+from django.contrib.postgres.operations import CreateExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # dmetaphone() and levenshtein() for duplicate detection (contacts.dedupe)
+
+    dependencies = [
+        ('contacts', '0008_relationship_stats'),
+    ]
+
+    operations = [
+        CreateExtension('fuzzystrmatch'),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0009_fuzzystrmatch_extension'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelationshipStatsDelta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.IntegerField(default=0, verbose_name='total contacts delta')),
+                ('linked', models.IntegerField(default=0, verbose_name='linked contacts delta')),
+                ('with_links', models.IntegerField(default=0, verbose_name='contacts with links delta')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+            ],
+            options={
+                'verbose_name': 'relationship statistics delta',
+                'verbose_name_plural': 'relationship statistics deltas',
+            },
+        ),
+    ]
@@ -1,10 +1,25 @@
 from django.db import models
-from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinLengthValidator, EmailValidator
+from django.db.models.functions import Upper
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
+def normalize_email(email):
+    """Canonical form of an email address as stored on Contact"""
+    return email.lower().strip()
+
+
+def normalize_phone(phone_number):
+    """Canonical form of a phone number as stored on Contact: digits and '+'"""
+    return ''.join(c for c in phone_number if c.isdigit() or c == '+')
+
+
+# Denormalized counters maintained by contacts.links.refresh_link_counts
+LINK_COUNTER_FIELDS = ('linked_clients_count', 'linked_files_count')
+
+
 class Contact(models.Model):
     class FileStatus(models.TextChoices):
         OPEN = 'OPEN', _('Open')
@@ -91,6 +106,17 @@ class Contact(models.Model):
         symmetrical=False,
         related_name='linked_contacts'
     )
+    # Denormalized link counts, kept exact by contacts.links
+    linked_clients_count = models.PositiveIntegerField(
+        _('linked clients count'),
+        default=0,
+        editable=False
+    )
+    linked_files_count = models.PositiveIntegerField(
+        _('linked files count'),
+        default=0,
+        editable=False
+    )
     
     # Metadata
     created_at = models.DateTimeField(
@@ -101,6 +127,8 @@ class Contact(models.Model):
         _('updated at'),
         auto_now=True
     )
+    # Maintained by a database trigger (migration 0003) so that bulk writes
+    # keep it current too; see contacts.search for the query side.
     search_vector = SearchVectorField(
         null=True,
         blank=True
@@ -109,13 +137,28 @@ class Contact(models.Model):
     class Meta:
         verbose_name = _('contact')
         verbose_name_plural = _('contacts')
-        ordering = ['last_name', 'first_name']
+        ordering = ['last_name', 'first_name', 'id']
         indexes = [
             GinIndex(fields=['search_vector']),
             models.Index(fields=['first_name', 'last_name']),
+            # Serves the ordering above and keyset pagination (contacts.pagination)
+            models.Index(fields=['last_name', 'first_name', 'id']),
             models.Index(fields=['file_number']),
             models.Index(fields=['client_status']),
             models.Index(fields=['file_status']),
+            # Top-N report queries on the link counters
+            models.Index(fields=['linked_clients_count']),
+            models.Index(fields=['linked_files_count']),
+            # pg_trgm indexes for substring/fuzzy search (contacts.search)
+            GinIndex(OpClass(Upper('first_name'), name='gin_trgm_ops'), name='contacts_first_name_trgm'),
+            GinIndex(OpClass(Upper('last_name'), name='gin_trgm_ops'), name='contacts_last_name_trgm'),
+            GinIndex(OpClass(Upper('file_number'), name='gin_trgm_ops'), name='contacts_file_number_trgm'),
+            GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='contacts_email_trgm'),
+            GinIndex(OpClass(Upper('phone_number'), name='gin_trgm_ops'), name='contacts_phone_number_trgm'),
+            # Prefix (istartswith) indexes for typeahead suggestions
+            models.Index(OpClass(Upper('last_name'), name='text_pattern_ops'), name='contacts_last_name_prefix'),
+            models.Index(OpClass(Upper('first_name'), name='text_pattern_ops'), name='contacts_first_name_prefix'),
+            models.Index(OpClass(Upper('file_number'), name='text_pattern_ops'), name='contacts_file_number_prefix'),
         ]
     
     def __str__(self):
@@ -133,7 +176,69 @@ class Contact(models.Model):
         return self.linked_contacts.all()
     
     def save(self, *args, **kwargs):
-        # Data cleaning
-        self.email = self.email.lower().strip()
-        self.phone_number = ''.join(c for c in self.phone_number if c.isdigit() or c == '+')
-        super().save(*args, **kwargs)
\ No newline at end of file
+        # Data cleaning; deferred fields are left deferred rather than
+        # loaded one query at a time
+        deferred = self.get_deferred_fields()
+        if 'email' not in deferred:
+            self.email = normalize_email(self.email)
+        if 'phone_number' not in deferred:
+            self.phone_number = normalize_phone(self.phone_number)
+        super().save(*args, **kwargs)
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        # The link counters are only written by contacts.links, so an
+        # instance loaded before a concurrent link change cannot write its
+        # stale counts back. They are dropped from the UPDATE only: an
+        # INSERT (for a row that no longer exists) still writes them.
+        values = [value for value in values if value[0].name not in LINK_COUNTER_FIELDS]
+        return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+
+
+class RelationshipStats(models.Model):
+    """
+    Single-row snapshot of the client/file relationship report.
+
+    Maintained incrementally by contacts.stats on contact and link changes,
+    and rebuilt by the refresh_relationship_stats management command.
+    """
+    total_contacts = models.PositiveIntegerField(_('total contacts'), default=0)
+    linked_contacts = models.PositiveIntegerField(
+        _('contacts with linked clients'),
+        default=0
+    )
+    contacts_with_links = models.PositiveIntegerField(
+        _('contacts with links in either direction'),
+        default=0
+    )
+    top_files = models.JSONField(_('top files'), default=list)
+    top_clients = models.JSONField(_('top clients'), default=list)
+    as_of = models.DateTimeField(_('as of'))
+
+    class Meta:
+        verbose_name = _('relationship statistics')
+        verbose_name_plural = _('relationship statistics')
+
+    def __str__(self):
+        return f"Relationship statistics as of {self.as_of}"
+
+    @property
+    def unlinked_contacts(self):
+        return self.total_contacts - self.linked_contacts
+
+
+class RelationshipStatsDelta(models.Model):
+    """
+    Pending change to the RelationshipStats counters.
+
+    Writers append a row instead of updating the single snapshot row, so
+    concurrent writes never queue on it; contacts.stats.fold_stats_deltas
+    applies the log on a schedule.
+    """
+    total = models.IntegerField(_('total contacts delta'), default=0)
+    linked = models.IntegerField(_('linked contacts delta'), default=0)
+    with_links = models.IntegerField(_('contacts with links delta'), default=0)
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('relationship statistics delta')
+        verbose_name_plural = _('relationship statistics deltas')
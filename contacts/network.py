@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.db import connection
+
+from .links import LinkedClients
+from .models import Contact
+
+# 'clients' follows linked_clients (from -> to), 'files' follows
+# linked_contacts (to -> from), 'both' follows either.
+DIRECTIONS = ('clients', 'files', 'both')
+
+
+def _reachable(root_id, depth, direction, limit):
+    """
+    Return [(id, depth)] for contacts within ``depth`` hops of ``root_id``,
+    nearest first, at most ``limit`` rows.
+
+    One recursive query. Each walk carries the ids it has visited so it
+    never loops back on itself, and DISTINCT ON keeps each contact once,
+    at its shortest distance.
+    """
+    links = connection.ops.quote_name(LinkedClients._meta.db_table)
+    steps = []
+    if direction in ('clients', 'both'):
+        steps.append(f"SELECT from_contact_id, to_contact_id FROM {links}")
+    if direction in ('files', 'both'):
+        steps.append(f"SELECT to_contact_id, from_contact_id FROM {links}")
+    sql = f"""
+        WITH RECURSIVE step(source, target) AS (
+            {' UNION ALL '.join(steps)}
+        ), reach(id, depth, path) AS (
+            SELECT %(root)s::bigint, 0, ARRAY[%(root)s::bigint]
+            UNION ALL
+            SELECT s.target, r.depth + 1, r.path || s.target
+            FROM reach r JOIN step s ON s.source = r.id
+            WHERE r.depth < %(depth)s AND NOT s.target = ANY(r.path)
+        )
+        SELECT id, depth FROM (
+            SELECT DISTINCT ON (id) id, depth FROM reach ORDER BY id, depth
+        ) AS nearest
+        ORDER BY depth, id
+        LIMIT %(limit)s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {'root': root_id, 'depth': depth, 'limit': limit})
+        return cursor.fetchall()
+
+
+def contact_network(root_id, depth=1, direction='both', max_nodes=None):
+    """
+    Return the subgraph reachable from ``root_id`` for graph rendering.
+
+    ``nodes`` are compact dicts with their hop distance, ``edges`` are
+    [from_id, to_id] pairs (from links to to as a linked client) between
+    the returned nodes. At most ``max_nodes`` nodes are returned, nearest
+    first; ``truncated`` tells whether the cap was hit.
+    """
+    max_nodes = max_nodes or settings.CONTACT_NETWORK['MAX_NODES']
+    reached = _reachable(root_id, depth, direction, max_nodes + 1)
+    truncated = len(reached) > max_nodes
+    depths = dict(reached[:max_nodes])
+    ids = list(depths)
+
+    rows = Contact.objects.filter(pk__in=ids).values_list(
+        'id', 'first_name', 'last_name', 'file_number'
+    )
+    details = {pk: rest for pk, *rest in rows}
+    nodes = [
+        {
+            'id': pk,
+            'name': f"{details[pk][0]} {details[pk][1]}",
+            'file_number': details[pk][2],
+            'depth': node_depth,
+        }
+        for pk, node_depth in depths.items() if pk in details
+    ]
+    edges = LinkedClients.objects.filter(
+        from_contact__in=ids, to_contact__in=ids
+    ).order_by('from_contact_id', 'to_contact_id').values_list('from_contact_id', 'to_contact_id')
+
+    return {
+        'root': root_id,
+        'depth': depth,
+        'direction': direction,
+        'nodes': nodes,
+        'edges': [list(edge) for edge in edges],
+        'truncated': truncated,
+    }
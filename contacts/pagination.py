@@ -0,0 +1,166 @@
+import base64
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from django.utils.functional import cached_property
+
+# Must match Contact.Meta.ordering and the composite index on it.
+KEYSET_FIELDS = ('last_name', 'first_name', 'id')
+
+
+def encode_cursor(values, reverse=False):
+    """Encode the keyset position of a row as an opaque URL-safe token"""
+    payload = json.dumps({'k': list(values), 'r': reverse}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor into (values, reverse); raises ValueError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values, reverse = payload['k'], bool(payload.get('r', False))
+    except (ValueError, TypeError, KeyError, AttributeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != len(KEYSET_FIELDS):
+        raise ValueError("Invalid cursor")
+    # Values reach the row comparison in SQL, so their types must match
+    # the columns: text for the names, an integer (not a bool) for id
+    *names, pk = values
+    if not all(isinstance(name, str) for name in names) or type(pk) is not int:
+        raise ValueError("Invalid cursor")
+    return values, reverse
+
+
+def keyset_filter(queryset, values, reverse=False):
+    """
+    Restrict ``queryset`` to rows after (or before) ``values``.
+
+    Uses a row-value comparison, (last_name, first_name, id) > (%s, %s, %s),
+    which Postgres answers with a single range scan on the composite index.
+    """
+    opts = queryset.model._meta
+    table = connection.ops.quote_name(opts.db_table)
+    columns = ', '.join(
+        f'{table}.{connection.ops.quote_name(opts.get_field(name).column)}'
+        for name in KEYSET_FIELDS
+    )
+    placeholders = ', '.join(['%s'] * len(KEYSET_FIELDS))
+    operator = '<' if reverse else '>'
+    return queryset.filter(RawSQL(
+        f'({columns}) {operator} ({placeholders})', values, output_field=BooleanField()
+    ))
+
+
+class KeysetPage:
+    """
+    One page of a keyset-paginated queryset.
+
+    Exposes the attributes templates need (has_next, has_previous,
+    has_other_pages) plus the cursors for the neighbouring pages.
+    """
+    is_keyset = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def _row_key(obj):
+    return [getattr(obj, name) for name in KEYSET_FIELDS]
+
+
+def paginate_keyset(queryset, cursor, page_size):
+    """
+    Return the KeysetPage addressed by ``cursor`` (None for the first page).
+
+    Fetches page_size + 1 rows to detect whether another page exists, so
+    no COUNT(*) is issued and every page costs the same.
+    """
+    values, reverse = decode_cursor(cursor) if cursor else (None, False)
+
+    if reverse:
+        queryset = queryset.order_by(*[f'-{name}' for name in KEYSET_FIELDS])
+    else:
+        queryset = queryset.order_by(*KEYSET_FIELDS)
+    if values is not None:
+        queryset = keyset_filter(queryset, values, reverse)
+
+    rows = list(queryset[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if reverse:
+        rows.reverse()
+
+    has_next = has_more if not reverse else values is not None
+    has_previous = values is not None if not reverse else has_more
+
+    next_cursor = previous_cursor = None
+    if rows and has_next:
+        next_cursor = encode_cursor(_row_key(rows[-1]))
+    if rows and has_previous:
+        previous_cursor = encode_cursor(_row_key(rows[0]), reverse=True)
+    return KeysetPage(rows, next_cursor, previous_cursor)
+
+
+def estimate_count(queryset):
+    """
+    Return the planner's row estimate for ``queryset`` without running it.
+
+    An unfiltered queryset reads pg_class.reltuples; anything else takes
+    the row estimate of EXPLAIN. Returns None when Postgres has no
+    statistics for the table yet.
+    """
+    queryset = queryset.order_by()
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(queryset.model._meta.db_table)]
+            )
+            row = cursor.fetchone()
+            estimate = row[0] if row else -1
+        else:
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = plan[0]['Plan']['Plan Rows']
+    return int(estimate) if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that trusts the planner's estimate for large result sets.
+
+    Below CONTACT_ADMIN['EXACT_COUNT_LIMIT'] estimated rows (or without
+    statistics) the exact COUNT(*) is used, so small tables and narrow
+    filters still show precise totals.
+    """
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is None or estimate < settings.CONTACT_ADMIN['EXACT_COUNT_LIMIT']:
+            return super().count
+        return estimate
@@ -0,0 +1,230 @@
+import hashlib
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet, ImproperlyConfigured
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, TrigramWordSimilarity
+)
+from django.db.models import Q
+from django.db.models.functions import Greatest, Upper
+
+from addressbook.routers import reads_may_be_stale
+from .cache import get_cache, get_contacts_version
+from .models import Contact
+
+# Text search configuration used by the search_vector trigger (see migration
+# 0003). Names, file numbers and phone numbers must not be stemmed, so the
+# 'simple' configuration is used on both the indexing and the query side.
+SEARCH_CONFIG = 'simple'
+
+# Columns covered by the UPPER(column) gin_trgm_ops indexes on Contact.
+TRIGRAM_FIELDS = ('first_name', 'last_name', 'file_number', 'email', 'phone_number')
+
+
+def build_search_query(text):
+    """Parse free text the way websearch_to_tsquery does ("quoted phrases", or, -not)"""
+    return SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+
+
+def fulltext_search(queryset, text):
+    """Filter and rank a Contact queryset against the stored search_vector"""
+    query = build_search_query(text)
+    return queryset.annotate(
+        rank=SearchRank('search_vector', query)
+    ).filter(
+        search_vector=query
+    ).order_by('-rank', 'last_name', 'first_name')
+
+
+def trigram_search(queryset, text):
+    """
+    Substring and fuzzy matching served by the pg_trgm GIN indexes.
+
+    icontains compiles to UPPER(column) LIKE UPPER('%text%'), which the
+    UPPER(column) trigram indexes answer directly; the word-similarity
+    match catches typos. Results are ranked by the best similarity.
+    """
+    aliases = {f'_trgm_{field}': Upper(field) for field in TRIGRAM_FIELDS}
+    condition = Q()
+    for field in TRIGRAM_FIELDS:
+        condition |= Q(**{f'{field}__icontains': text})
+        condition |= Q(**{f'_trgm_{field}__trigram_word_similar': text})
+
+    return queryset.alias(**aliases).annotate(
+        rank=Greatest(*[
+            TrigramWordSimilarity(text, f'_trgm_{field}') for field in TRIGRAM_FIELDS
+        ])
+    ).filter(condition).order_by('-rank', 'last_name', 'first_name')
+
+
+def icontains_search(queryset, text):
+    """The original OR-of-icontains search, kept as a baseline for comparison"""
+    query = build_search_query(text)
+    return queryset.annotate(
+        rank=SearchRank('search_vector', query)
+    ).filter(
+        Q(search_vector=query) |
+        Q(first_name__icontains=text) |
+        Q(last_name__icontains=text) |
+        Q(file_number__icontains=text) |
+        Q(email__icontains=text) |
+        Q(phone_number__icontains=text)
+    ).order_by('-rank', 'last_name', 'first_name')
+
+
+SEARCH_BACKENDS = {
+    'fulltext': fulltext_search,
+    'trigram': trigram_search,
+    'icontains': icontains_search,
+}
+
+
+def get_backend_name(name=None):
+    """
+    Return ``name`` if it is a registered backend.
+
+    Unknown or empty names fall back to CONTACT_SEARCH['BACKEND'], which
+    must itself be registered (checked at startup by ContactsConfig.ready).
+    """
+    if name in SEARCH_BACKENDS:
+        return name
+    default = settings.CONTACT_SEARCH['BACKEND']
+    if default not in SEARCH_BACKENDS:
+        raise ImproperlyConfigured(
+            f"CONTACT_SEARCH['BACKEND'] is {default!r}; expected one of: "
+            f"{', '.join(sorted(SEARCH_BACKENDS))}"
+        )
+    return default
+
+
+def search_contacts(queryset, text, backend=None):
+    """Apply the selected search backend to a Contact queryset (uncached)"""
+    return SEARCH_BACKENDS[get_backend_name(backend)](queryset, text)
+
+
+def normalize_query(text):
+    """Collapse whitespace and case so equivalent queries share a cache entry"""
+    return ' '.join(text.split()).lower()
+
+
+class SearchResults(Sequence):
+    """
+    Ranked contact ids for a query, loaded lazily one page at a time.
+
+    Supports len() and slicing, so it can be handed to Django's Paginator
+    and DRF's pagination classes in place of a queryset. Slices are
+    hydrated with a single primary key lookup against ``queryset``, which
+    keeps any select_related/prefetch_related set up by the caller.
+    ``truncated`` is True when more than CONTACT_SEARCH['MAX_RESULTS']
+    contacts matched and only the best ranked ones were kept.
+    """
+
+    def __init__(self, ids, queryset, truncated=False):
+        self.ids = ids
+        self.queryset = queryset
+        self.truncated = truncated
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            ids = self.ids[index]
+            objects = self.queryset.in_bulk(ids)
+            return [objects[pk] for pk in ids if pk in objects]
+        return self.queryset.get(pk=self.ids[index])
+
+
+def _queryset_scope(queryset):
+    """Cache key part identifying the filters of ``queryset``"""
+    if not queryset.query.where:
+        return 'all'
+    sql = str(queryset.order_by().values('pk').query)
+    return hashlib.md5(sql.encode()).hexdigest()
+
+
+def find_contacts(text, backend=None, queryset=None):
+    """
+    Search contacts through the result cache.
+
+    Only contacts in ``queryset`` are searched, so filters applied by the
+    caller are respected. The ranked id list for a normalized query and
+    filter set is cached under the current contacts version, so any
+    contact or link change makes it unreachable. At most
+    CONTACT_SEARCH['MAX_RESULTS'] ids are kept per query.
+    """
+    if queryset is None:
+        queryset = Contact.objects.all()
+    backend = get_backend_name(backend)
+    text = normalize_query(text)
+    max_results = settings.CONTACT_SEARCH['MAX_RESULTS']
+    try:
+        scope = _queryset_scope(queryset)
+    except EmptyResultSet:
+        return SearchResults([], queryset)
+    digest = hashlib.md5(text.encode()).hexdigest()
+    key = f'contacts:search:{get_contacts_version()}:{backend}:{scope}:{digest}'
+
+    cache = get_cache()
+    ids = cache.get(key)
+    if ids is None:
+        # One extra id tells whether the results were capped
+        ids = list(
+            search_contacts(queryset, text, backend)
+            .values_list('id', flat=True)[:max_results + 1]
+        )
+        if not reads_may_be_stale():
+            cache.set(key, ids, settings.CONTACT_SEARCH['CACHE_TIMEOUT'])
+    return SearchResults(ids[:max_results], queryset, truncated=len(ids) > max_results)
+
+
+def _prefix_condition(text):
+    """
+    Prefix match served by the UPPER(column) text_pattern_ops indexes.
+
+    A two-word query is read as "first last" or "last first".
+    """
+    terms = text.split()
+    if len(terms) > 1:
+        first, last = terms[0], terms[-1]
+        return (
+            Q(first_name__istartswith=first, last_name__istartswith=last) |
+            Q(last_name__istartswith=first, first_name__istartswith=last)
+        )
+    return (
+        Q(last_name__istartswith=text) |
+        Q(first_name__istartswith=text) |
+        Q(file_number__istartswith=text)
+    )
+
+
+def suggest_contacts(text, limit=None):
+    """
+    Return the top ``limit`` prefix matches as compact dicts for typeahead.
+
+    Results are cached under the contacts version like full searches.
+    """
+    max_limit = settings.CONTACT_SEARCH['SUGGEST_LIMIT']
+    limit = max(1, min(limit or max_limit, max_limit))
+    text = normalize_query(text)
+    if not text:
+        return []
+
+    digest = hashlib.md5(text.encode()).hexdigest()
+    key = f'contacts:suggest:{get_contacts_version()}:{limit}:{digest}'
+    cache = get_cache()
+    suggestions = cache.get(key)
+    if suggestions is None:
+        rows = Contact.objects.filter(
+            _prefix_condition(text)
+        ).order_by(
+            'last_name', 'first_name', 'id'
+        ).values_list('id', 'first_name', 'last_name', 'file_number')[:limit]
+        suggestions = [
+            {'id': pk, 'name': f"{first_name} {last_name}", 'file_number': file_number}
+            for pk, first_name, last_name, file_number in rows
+        ]
+        if not reads_may_be_stale():
+            cache.set(key, suggestions, settings.CONTACT_SEARCH['CACHE_TIMEOUT'])
+    return suggestions
@@ -0,0 +1,48 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache import bump_contacts_version, invalidate_contacts
+from .links import linked_contact_ids, refresh_link_counts
+from .models import Contact
+from .stats import apply_stats_delta, link_state
+
+
+@receiver(post_save, sender=Contact)
+def contact_saved(sender, instance, created, **kwargs):
+    if created:
+        # New contacts start without links
+        apply_stats_delta(total=1)
+    else:
+        invalidate_contacts([instance.pk])
+    bump_contacts_version()
+
+
+@receiver(pre_delete, sender=Contact)
+def contact_deleting(sender, instance, **kwargs):
+    # The through rows are gone by post_delete, so remember the neighbours
+    # whose counters will need refreshing and the contact's own counts.
+    instance._linked_ids_before_delete = linked_contact_ids([instance.pk])
+    instance._link_counts_before_delete = Contact.objects.filter(
+        pk=instance.pk
+    ).values_list('linked_clients_count', 'linked_files_count').first() or (0, 0)
+
+
+@receiver(post_delete, sender=Contact)
+def contact_deleted(sender, instance, **kwargs):
+    refresh_link_counts(getattr(instance, '_linked_ids_before_delete', ()))
+    had_clients, had_links = link_state(*getattr(instance, '_link_counts_before_delete', (0, 0)))
+    apply_stats_delta(total=-1, linked=-had_clients, with_links=-had_links, refresh_top=True)
+    invalidate_contacts([instance.pk])
+    bump_contacts_version()
+
+
+@receiver(m2m_changed, sender=Contact.linked_clients.through)
+def contact_links_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        related = instance.linked_contacts if reverse else instance.linked_clients
+        instance._linked_ids_before_clear = set(related.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if action == 'post_clear':
+            pk_set = getattr(instance, '_linked_ids_before_clear', set())
+        refresh_link_counts({instance.pk, *pk_set})
+        bump_contacts_version()
@@ -0,0 +1,122 @@
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import Contact, RelationshipStats, RelationshipStatsDelta
+
+SNAPSHOT_PK = 1
+TOP_N = 10
+
+
+def _top_entries(count_field, label):
+    """Top contacts by a link counter, served by the index on that counter"""
+    rows = Contact.objects.filter(
+        **{f'{count_field}__gt': 0}
+    ).order_by(f'-{count_field}').values_list(
+        'id', 'file_number', 'first_name', 'last_name', count_field
+    )[:TOP_N]
+    return [
+        {
+            'id': pk,
+            'file_number': file_number,
+            'name': f"{first_name} {last_name}",
+            label: count,
+        }
+        for pk, file_number, first_name, last_name, count in rows
+    ]
+
+
+def _lock_deltas():
+    """
+    Take the delta log for the rest of the transaction.
+
+    Waits for writers that have appended deltas to commit and blocks new
+    ones, so the rows deleted next match the state the snapshot is built
+    or updated from.
+    """
+    table = connection.ops.quote_name(RelationshipStatsDelta._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {table} IN EXCLUSIVE MODE")
+
+
+def refresh_relationship_stats():
+    """Rebuild the snapshot from scratch, discarding pending deltas, and return it"""
+    with transaction.atomic():
+        _lock_deltas()
+        RelationshipStatsDelta.objects.all().delete()
+        totals = Contact.objects.aggregate(
+            total=Count('id'),
+            linked=Count('id', filter=Q(linked_clients_count__gt=0)),
+            with_links=Count('id', filter=Q(linked_clients_count__gt=0) | Q(linked_files_count__gt=0)),
+        )
+        stats, _ = RelationshipStats.objects.update_or_create(
+            pk=SNAPSHOT_PK,
+            defaults={
+                'total_contacts': totals['total'],
+                'linked_contacts': totals['linked'],
+                'contacts_with_links': totals['with_links'],
+                'top_files': _top_entries('linked_clients_count', 'client_count'),
+                'top_clients': _top_entries('linked_files_count', 'file_count'),
+                'as_of': timezone.now(),
+            }
+        )
+    return stats
+
+
+def fold_stats_deltas():
+    """
+    Apply the pending deltas to the snapshot and refresh its top lists.
+
+    Returns the number of deltas folded. The snapshot is left untouched,
+    and keeps its as_of, when there is nothing to fold.
+    """
+    table = connection.ops.quote_name(RelationshipStatsDelta._meta.db_table)
+    with transaction.atomic():
+        # Same lock order as refresh_relationship_stats: log, then snapshot
+        _lock_deltas()
+        if not RelationshipStats.objects.select_for_update().filter(pk=SNAPSHOT_PK).exists():
+            refresh_relationship_stats()
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"WITH folded AS (DELETE FROM {table} RETURNING total, linked, with_links) "
+                f"SELECT count(*), coalesce(sum(total), 0), coalesce(sum(linked), 0), "
+                f"coalesce(sum(with_links), 0) FROM folded"
+            )
+            count, total, linked, with_links = cursor.fetchone()
+        if count:
+            RelationshipStats.objects.filter(pk=SNAPSHOT_PK).update(
+                total_contacts=F('total_contacts') + total,
+                linked_contacts=F('linked_contacts') + linked,
+                contacts_with_links=F('contacts_with_links') + with_links,
+                top_files=_top_entries('linked_clients_count', 'client_count'),
+                top_clients=_top_entries('linked_files_count', 'file_count'),
+                as_of=timezone.now(),
+            )
+    return count
+
+
+def get_relationship_stats():
+    """Return the current snapshot, building it on first use"""
+    stats = RelationshipStats.objects.filter(pk=SNAPSHOT_PK).first()
+    if stats is None:
+        stats = refresh_relationship_stats()
+    return stats
+
+
+def link_state(clients_count, files_count):
+    """(has linked clients, has links in either direction) for a contact"""
+    return int(clients_count > 0), int(clients_count > 0 or files_count > 0)
+
+
+def apply_stats_delta(total=0, linked=0, with_links=0, refresh_top=False):
+    """
+    Record a change to the snapshot counters.
+
+    A row is appended to the delta log inside the caller's transaction;
+    the snapshot row itself is only written by fold_stats_deltas, so
+    writers do not serialize on it. ``refresh_top`` records a change that
+    only affects the top lists.
+    """
+    if total or linked or with_links or refresh_top:
+        RelationshipStatsDelta.objects.create(total=total, linked=linked, with_links=with_links)
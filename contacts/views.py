@@ -1,15 +1,20 @@
 from django.contrib import messages
-from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
-from django.db.models import Count, Q
+from django.core.exceptions import BadRequest
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views.generic import (
     ListView, CreateView, UpdateView, DeleteView, TemplateView, DetailView
 )
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from addressbook.routers import replica_reads
+from .conditional import contact_page_condition, report_condition
 from .models import Contact
 from .forms import ContactForm
+from .pagination import paginate_keyset
+from .search import find_contacts
+from .stats import get_relationship_stats
 
 class ContactListView(ListView):
     model = Contact
@@ -22,24 +27,39 @@ class ContactListView(ListView):
         search_query = self.request.GET.get('q', '').strip()
         
         if search_query:
-            queryset = queryset.annotate(
-                rank=SearchRank('search_vector', SearchQuery(search_query))
-            ).filter(
-                Q(search_vector=SearchQuery(search_query)) |
-                Q(first_name__icontains=search_query) |
-                Q(last_name__icontains=search_query) |
-                Q(file_number__icontains=search_query) |
-                Q(email__icontains=search_query) |
-                Q(phone_number__icontains=search_query)
-            ).order_by('-rank', 'last_name', 'first_name')
+            queryset = find_contacts(
+                search_query,
+                backend=self.request.GET.get('backend'),
+                queryset=queryset
+            )
         
         return queryset
     
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Keyset-paginate the plain listing; ranked search results and
+        ?page= links keep using page numbers
+        """
+        if self.request.GET.get('q', '').strip() or 'page' in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+        try:
+            page = paginate_keyset(queryset, self.request.GET.get('cursor'), page_size)
+        except ValueError:
+            raise BadRequest("Invalid cursor")
+        return (None, page, page.object_list, page.has_other_pages())
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['search_query'] = self.request.GET.get('q', '')
+        context['search_truncated'] = getattr(self.object_list, 'truncated', False)
+        # Current filters for the pagination links, without the position
+        params = self.request.GET.copy()
+        params.pop('cursor', None)
+        params.pop('page', None)
+        context['query_params'] = params.urlencode()
         return context
 
+@method_decorator(contact_page_condition, name='get')
 class ContactDetailView(DetailView):
     model = Contact
     template_name = 'contacts/contact_detail.html'
@@ -113,81 +133,56 @@ class ContactSearchView(ListView):
         search_query = self.request.GET.get('q', '').strip()
         
         if search_query:
-            vector = SearchVector('first_name', 'last_name', 'email', 'phone_number', 'file_number')
-            queryset = queryset.annotate(
-                search=vector,
-                rank=SearchRank(vector, SearchQuery(search_query))
-            ).filter(
-                Q(search=SearchQuery(search_query)) |
-                Q(first_name__icontains=search_query) |
-                Q(last_name__icontains=search_query) |
-                Q(file_number__icontains=search_query)
-            ).order_by('-rank')
+            queryset = find_contacts(
+                search_query,
+                backend=self.request.GET.get('backend'),
+                queryset=queryset
+            )
             
         return queryset
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['search_query'] = self.request.GET.get('q', '')
+        context['search_truncated'] = getattr(self.object_list, 'truncated', False)
         return context
 
+@method_decorator(replica_reads, name='get')
 class ClientLinkReportView(TemplateView):
     template_name = 'contacts/client_link_report.html'
+    query_budget = 4
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        context['top_files'] = Contact.objects.annotate(
-            client_count=Count('linked_clients')
-        ).filter(client_count__gt=0).order_by('-client_count')[:10]
-        
-        context['top_clients'] = Contact.objects.annotate(
-            file_count=Count('linked_contacts')
-        ).filter(file_count__gt=0).order_by('-file_count')[:10]
-        
-        context['unlinked_contacts'] = Contact.objects.filter(
-            linked_clients__isnull=True
-        ).count()
-        
-        context['total_contacts'] = Contact.objects.count()
-        context['linked_contacts'] = context['total_contacts'] - context['unlinked_contacts']
+        stats = get_relationship_stats()
+        context['top_files'] = stats.top_files
+        context['top_clients'] = stats.top_clients
+        context['total_contacts'] = stats.total_contacts
+        context['linked_contacts'] = stats.linked_contacts
+        context['unlinked_contacts'] = stats.unlinked_contacts
+        context['as_of'] = stats.as_of
         
         return context
 
+@method_decorator(replica_reads, name='get')
+@method_decorator(report_condition, name='get')
 class ClientRelationshipReportView(APIView):
     """
     API endpoint that provides client relationship statistics
     """
+    query_budget = 4
     def get(self, request, format=None):
-        top_files = Contact.objects.annotate(
-            client_count=Count('linked_clients')
-        ).filter(client_count__gt=0).order_by('-client_count')[:10]
-        
-        top_clients = Contact.objects.annotate(
-            file_count=Count('linked_contacts')
-        ).filter(file_count__gt=0).order_by('-file_count')[:10]
-        
+        stats = get_relationship_stats()
         data = {
-            'top_files': [
-                {
-                    'id': contact.id,
-                    'file_number': contact.file_number,
-                    'name': f"{contact.first_name} {contact.last_name}",
-                    'client_count': contact.client_count
-                } for contact in top_files
-            ],
-            'top_clients': [
-                {
-                    'id': contact.id,
-                    'name': f"{contact.first_name} {contact.last_name}",
-                    'file_count': contact.file_count
-                } for contact in top_clients
-            ],
+            'top_files': stats.top_files,
+            'top_clients': stats.top_clients,
             'stats': {
-                'total_contacts': Contact.objects.count(),
-                'linked_contacts': Contact.objects.filter(linked_clients__isnull=False).count(),
-                'unlinked_contacts': Contact.objects.filter(linked_clients__isnull=True).count(),
-            }
+                'total_contacts': stats.total_contacts,
+                'linked_contacts': stats.linked_contacts,
+                'unlinked_contacts': stats.unlinked_contacts,
+            },
+            'as_of': stats.as_of,
         }
         return Response(data, status=status.HTTP_200_OK)
     
\ No newline at end of file
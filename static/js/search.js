@@ -4,6 +4,7 @@ document.addEventListener('DOMContentLoaded', function() {
     const resultsContainer = document.getElementById('results-container');
     const statusFilter = document.getElementById('status-filter');
     const clientStatusFilter = document.getElementById('client-status-filter');
+    const suggestionsContainer = document.getElementById('suggestions');
     
     // Debounce function to limit API calls
     const debounce = (func, delay) => {
@@ -43,6 +44,39 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     };
 
+    // Escape text before inserting it into HTML
+    const escapeHtml = (text) => String(text).replace(/[&<>"']/g, (c) => ({
+        '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+    })[c]);
+
+    // Fetch typeahead suggestions (id, name and file number only)
+    const fetchSuggestions = async (query) => {
+        if (query.trim().length < 2) {
+            suggestionsContainer.innerHTML = '';
+            return;
+        }
+
+        try {
+            const params = new URLSearchParams({ q: query });
+            const response = await fetch(`/api/contacts/suggest/?${params.toString()}`);
+            const data = await response.json();
+            renderSuggestions(data.results || []);
+        } catch (error) {
+            console.error('Suggest error:', error);
+            suggestionsContainer.innerHTML = '';
+        }
+    };
+
+    // Render suggestions as a dropdown under the search input
+    const renderSuggestions = (suggestions) => {
+        suggestionsContainer.innerHTML = suggestions.map(suggestion => `
+            <a href="/${suggestion.id}/" class="list-group-item list-group-item-action">
+                ${escapeHtml(suggestion.name)}
+                <small class="text-muted ms-2">${escapeHtml(suggestion.file_number)}</small>
+            </a>
+        `).join('');
+    };
+
     // Render results to the page
     const renderResults = (contacts) => {
         if (!contacts || contacts.length === 0) {
@@ -102,8 +136,13 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // Event listeners with debouncing
     searchInput.addEventListener('input', debounce(function() {
-        fetchResults(this.value);
-    }, 300));
+        fetchSuggestions(this.value);
+    }, 150));
+
+    searchInput.addEventListener('blur', () => {
+        // Delay so a click on a suggestion is not lost
+        setTimeout(() => { suggestionsContainer.innerHTML = ''; }, 200);
+    });
 
     statusFilter.addEventListener('change', () => {
         fetchResults(searchInput.value);
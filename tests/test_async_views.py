@@ -0,0 +1,35 @@
+from unittest import mock
+
+from rest_framework.throttling import ScopedRateThrottle
+
+from contacts.stats import refresh_relationship_stats
+
+from .utils import APITransactionTestCase, make_contact
+
+
+class AsyncViewTests(APITransactionTestCase):
+    def test_invalid_token_is_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+        response = self.client.get('/api/async/search/', {'q': 'First'})
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('WWW-Authenticate', response)
+
+    def test_suggest_is_throttled_like_the_sync_view(self):
+        make_contact()
+        with mock.patch.object(ScopedRateThrottle, 'THROTTLE_RATES', {'contact_suggest': '1/min'}):
+            self.assertEqual(self.client.get('/api/async/suggest/', {'q': 'Fir'}).status_code, 200)
+            self.assertEqual(self.client.get('/api/async/suggest/', {'q': 'Fir'}).status_code, 429)
+
+    def test_report_matches_the_sync_view(self):
+        file, client = make_contact(), make_contact()
+        file.linked_clients.add(client)
+        refresh_relationship_stats()
+        sync = self.client.get('/api/contacts/relationship-report/').json()
+        self.assertEqual(self.client.get('/api/async/relationship-report/').json(), sync)
+        self.assertEqual(sync['stats']['contacts_with_links'], 2)
+
+    def test_missing_contact_is_a_json_404_like_the_sync_view(self):
+        sync = self.client.get('/api/contacts/0/')
+        response = self.client.get('/api/async/contacts/0/')
+        self.assertEqual((response.status_code, sync.status_code), (404, 404))
+        self.assertEqual(response.json(), sync.json())
@@ -0,0 +1,38 @@
+from django.contrib.auth import get_user_model
+from rest_framework.authtoken.models import Token
+
+from api.authentication import CachedTokenAuthentication, get_token_cache, token_cache_key
+
+from .utils import APITestCase
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user('token', password='secret')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_cache_holds_no_user_row(self):
+        CachedTokenAuthentication().authenticate_credentials(self.token.key)
+        cached = get_token_cache().get(token_cache_key(self.token.key))
+        self.assertEqual(
+            cached, {'key': self.token.key, 'user_id': self.user.pk, 'is_active': True}
+        )
+
+    def test_cached_token_authenticates_without_queries(self):
+        auth = CachedTokenAuthentication()
+        auth.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            user, token = auth.authenticate_credentials(self.token.key)
+            self.assertTrue(user.is_authenticated)
+        self.assertEqual((user.pk, token.key), (self.user.pk, self.token.key))
+        # Other fields are loaded on use
+        self.assertEqual(user.username, 'token')
+
+    def test_deactivated_user_is_rejected(self):
+        self.assertEqual(self.client.get('/api/contacts/cache-stats/').status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.client.get('/api/contacts/cache-stats/').status_code, 401)
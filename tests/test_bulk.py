@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from contacts.models import Contact
+
+from .utils import APITestCase, make_contact
+
+
+class BulkEndpointTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        user = get_user_model().objects.create_user('bulk', password='secret')
+        self.client.force_authenticate(user)
+        self.url = reverse('contact-bulk')
+
+    def item(self, n, **fields):
+        return {
+            'first_name': f'Bulk{n}', 'last_name': 'Item', 'phone_number': f'+2548{n:08d}',
+            'email': f'bulk{n}@example.com', 'address': 'Nairobi', 'file_number': f'B-{n:06d}',
+            **fields,
+        }
+
+    def test_create_reports_errors_per_item(self):
+        target = make_contact()
+        items = [
+            self.item(1, linked_clients=[target.pk]),
+            self.item(2, email='bulk1@example.com'),
+            self.item(3, linked_clients=[0]),
+        ]
+        response = self.client.post(self.url, items, format='json')
+
+        self.assertEqual(response.status_code, 207)
+        results = response.json()['results']
+        self.assertEqual([result['status'] for result in results], ['created', 'error', 'error'])
+        self.assertIn('email', results[1]['errors'])
+        self.assertIn('linked_clients', results[2]['errors'])
+        created = Contact.objects.get(pk=results[0]['id'])
+        self.assertEqual(created.linked_clients_count, 1)
+        target.refresh_from_db()
+        self.assertEqual(target.linked_files_count, 1)
+
+    def test_delete_removes_links_and_refreshes_neighbours(self):
+        file, client = make_contact(), make_contact()
+        file.linked_clients.add(client)
+
+        response = self.client.delete(self.url, [client.pk, 0], format='json')
+
+        self.assertEqual(response.status_code, 207)
+        statuses = [result['status'] for result in response.json()['results']]
+        self.assertEqual(statuses, ['deleted', 'error'])
+        self.assertFalse(Contact.objects.filter(pk=client.pk).exists())
+        file.refresh_from_db()
+        self.assertEqual(file.linked_clients_count, 0)
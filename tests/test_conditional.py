@@ -0,0 +1,65 @@
+from unittest import mock
+
+from django.contrib import messages
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.test import RequestFactory
+
+from contacts.conditional import contact_page_etag
+
+from .utils import APITestCase, make_contact
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.contact = make_contact()
+
+    def test_api_returns_304_until_contacts_change(self):
+        response = self.client.get('/api/contacts/')
+        etag = response['ETag']
+
+        response = self.client.get('/api/contacts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        make_contact()
+        response = self.client.get('/api/contacts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_no_validators_when_reads_may_be_stale(self):
+        with mock.patch('contacts.conditional.reads_may_be_stale', return_value=True):
+            response = self.client.get('/api/contacts/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_html_pages_are_not_conditional(self):
+        for path in ('/', '/search/?q=First', '/reports/links/'):
+            with self.subTest(path=path):
+                response = self.client.get(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(response.has_header('ETag'))
+
+    def test_contact_page_etag_is_per_session(self):
+        path = f'/{self.contact.pk}/'
+        response = self.client.get(path)
+        etag = response['ETag']
+        self.assertIn('Cookie', response['Vary'])
+        self.assertFalse(response.has_header('Last-Modified'))
+
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.client.force_login(User.objects.create_user('viewer'))
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_contact_page_has_no_etag_while_messages_are_pending(self):
+        request = RequestFactory().get(f'/{self.contact.pk}/')
+        request._messages = CookieStorage(request)
+        self.assertIsNotNone(contact_page_etag(request))
+
+        messages.success(request, "Saved.")
+        self.assertIsNone(contact_page_etag(request))
@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+
+from contacts.models import Contact
+
+from .utils import APITestCase, make_contact
+
+
+class ContactWriteTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user('writer', password='secret')
+
+    def test_create_and_update(self):
+        target = make_contact()
+        self.client.force_authenticate(self.user)
+        response = self.client.post('/api/contacts/', {
+            'first_name': 'Ann', 'last_name': 'Lee', 'phone_number': '+254711000001',
+            'email': 'ann@example.com', 'address': 'Nairobi', 'file_number': 'W-1',
+            'linked_clients': [target.pk],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['linked_clients_count'], 1)
+
+        pk = response.json()['id']
+        response = self.client.patch(f'/api/contacts/{pk}/', {'company': 'Acme'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Contact.objects.get(pk=pk).company, 'Acme')
+
+    def test_anonymous_update_is_rejected(self):
+        contact = make_contact()
+        response = self.client.patch(f'/api/contacts/{contact.pk}/', {'company': 'Acme'}, format='json')
+        self.assertIn(response.status_code, (401, 403))
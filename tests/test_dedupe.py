@@ -0,0 +1,60 @@
+import io
+import json
+
+from django.test import TestCase
+
+from contacts.dedupe import DuplicateFinder, DuplicateMerger
+from contacts.links import add_links
+from contacts.models import Contact
+
+from .utils import make_contact
+
+
+class DuplicateFinderTests(TestCase):
+    def test_reformatted_phone_and_swapped_names_match(self):
+        original = make_contact(first_name='Grace', last_name='Wanjiru', phone_number='+254712345678')
+        duplicate = make_contact(first_name='Wanjiru', last_name='Grace', phone_number='0712345678')
+        groups = DuplicateFinder().run()
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(
+            sorted([groups[0]['survivor'], *groups[0]['duplicates']]), [original.pk, duplicate.pk]
+        )
+
+    def test_shared_phone_and_email_without_similar_names_do_not_match(self):
+        make_contact(
+            first_name='Grace', last_name='Wanjiru', phone_number='+254712345678',
+            email='kamau.family@example.com'
+        )
+        make_contact(
+            first_name='Peter', last_name='Otieno', phone_number='0712345678',
+            email='kamaufamily@example.com'
+        )
+        self.assertEqual(DuplicateFinder().run(), [])
+
+
+class DuplicateMergerTests(TestCase):
+    def test_merge_repoints_edges_deletes_duplicates_and_writes_backup(self):
+        survivor, duplicate = make_contact(), make_contact(company='Acme')
+        client, file = make_contact(), make_contact()
+        add_links([(duplicate.pk, client.pk), (file.pk, duplicate.pk)])
+
+        backup = io.StringIO()
+        counts = DuplicateMerger(backup=backup).run(
+            [{'survivor': survivor.pk, 'duplicates': [duplicate.pk]}]
+        )
+
+        self.assertEqual((counts['merged'], counts['links_repointed']), (1, 2))
+        self.assertFalse(Contact.objects.filter(pk=duplicate.pk).exists())
+        survivor.refresh_from_db()
+        self.assertEqual(survivor.company, 'Acme')
+        self.assertEqual(list(survivor.linked_clients.values_list('pk', flat=True)), [client.pk])
+        self.assertEqual(list(survivor.linked_contacts.values_list('pk', flat=True)), [file.pk])
+        self.assertEqual((survivor.linked_clients_count, survivor.linked_files_count), (1, 1))
+
+        group = json.loads(backup.getvalue())
+        self.assertEqual(group['survivor']['contact']['id'], survivor.pk)
+        self.assertIsNone(group['survivor']['contact']['company'])
+        [saved] = group['duplicates']
+        self.assertEqual(saved['contact']['email'], duplicate.email)
+        self.assertEqual(saved['contact']['company'], 'Acme')
+        self.assertEqual((saved['linked_clients'], saved['linked_files']), ([client.pk], [file.pk]))
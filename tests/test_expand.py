@@ -0,0 +1,35 @@
+from unittest import mock
+
+from api.pagination import ContactKeysetPagination
+from api.serializers import MAX_EXPAND_DEPTH
+from contacts.links import add_links
+
+from .utils import APITestCase, make_contact
+
+
+class ExpandQueryCountTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        ids = [make_contact().pk for _ in range(101)]
+        # Every contact links to the next two, so each expanded level is
+        # non-empty whatever page is rendered
+        add_links(
+            (ids[i], ids[(i + step) % len(ids)])
+            for i in range(len(ids)) for step in (1, 2)
+        )
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        for depth in (1, MAX_EXPAND_DEPTH):
+            for page_size in (1, 10, 100):
+                with self.subTest(depth=depth, page_size=page_size), \
+                        mock.patch.object(ContactKeysetPagination, 'page_size', page_size):
+                    # The page, one query per expanded level and the ids
+                    # of the level below
+                    with self.assertNumQueries(depth + 2):
+                        response = self.client.get(
+                            '/api/contacts/', {'expand': 'linked_clients', 'depth': depth}
+                        )
+                    self.assertEqual(response.status_code, 200)
+                    results = response.json()['results']
+                    self.assertEqual(len(results), page_size)
+                    self.assertEqual(len(results[0]['linked_clients_details']), 2)
@@ -0,0 +1,39 @@
+import csv
+import io
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+
+from .utils import APITestCase, make_contact
+
+
+class ExportTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        user = get_user_model().objects.create_user('export', password='secret')
+        self.client.force_authenticate(user)
+        self.contacts = [make_contact() for _ in range(3)]
+        self.contacts[0].linked_clients.add(self.contacts[1])
+
+    def rows(self, body):
+        return list(csv.DictReader(io.StringIO(body)))
+
+    def test_csv_export_with_links(self):
+        response = self.client.get(reverse('contact-export'), {'links': 'true'})
+        self.assertEqual(response.status_code, 200)
+        rows = self.rows(b''.join(response.streaming_content).decode())
+        self.assertEqual([int(row['id']) for row in rows], [c.pk for c in self.contacts])
+        self.assertEqual(rows[0]['linked_client_ids'], str(self.contacts[1].pk))
+
+    @override_settings(SERVER_MODE='asgi')
+    def test_asgi_export_is_an_async_stream(self):
+        response = self.client.get(reverse('contact-export'))
+        self.assertTrue(response.is_async)
+
+        async def read():
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        rows = self.rows(async_to_sync(read)().decode())
+        self.assertEqual(len(rows), 3)
@@ -0,0 +1,75 @@
+import io
+import json
+
+from django.test import TestCase
+
+from contacts.importer import ContactImporter, read_ndjson
+from contacts.models import Contact
+
+from .utils import make_contact
+
+
+class ErrorCollector:
+    def __init__(self):
+        self.rows = []
+
+    def writerow(self, row):
+        self.rows.append(row)
+
+
+def record(name, file_number, phone):
+    return {
+        'first_name': name, 'last_name': 'Doe', 'file_number': file_number,
+        'phone_number': phone, 'email': f'{name.lower()}@example.com', 'address': 'Nairobi',
+    }
+
+
+class NDJSONImportTests(TestCase):
+    def test_bad_lines_are_reported_and_import_continues(self):
+        stream = io.StringIO(
+            json.dumps(record('Ann', 'F-1', '+254700000001')) + '\n'
+            '\n'
+            '{"first_name": "Bob", "last_name"\n'
+            '["not", "an", "object"]\n'
+            + json.dumps(record('Cyd', 'F-2', '+254700000002')) + '\n'
+        )
+        errors = ErrorCollector()
+        counts = ContactImporter(error_writer=errors).run(read_ndjson(stream))
+
+        self.assertEqual(counts['read'], 4)
+        self.assertEqual(counts['invalid'], 2)
+        self.assertEqual(counts['created'], 2)
+        self.assertEqual(
+            sorted(Contact.objects.values_list('file_number', flat=True)), ['F-1', 'F-2']
+        )
+        messages = [message for _, message in errors.rows]
+        self.assertTrue(messages[0].startswith('line 3: invalid JSON'))
+        self.assertTrue(messages[1].startswith('line 4: expected a JSON object'))
+
+
+class UpsertTests(TestCase):
+    def test_rows_match_existing_contacts_on_email_or_phone(self):
+        by_email = make_contact(email='grace@example.com')
+        by_phone = make_contact(phone_number='+254722000001')
+        records = [
+            {**record('Ann', 'NEW-1', '+254733000001'),
+             'email': 'Grace@Example.com', 'company': 'Acme'},
+            {**record('Bob', 'NEW-2', '+254 722 000 001'), 'company': 'Beta'},
+        ]
+        counts = ContactImporter().run(records)
+
+        self.assertEqual((counts['updated'], counts['created'], counts['rejected']), (2, 0, 0))
+        by_email.refresh_from_db()
+        by_phone.refresh_from_db()
+        self.assertEqual((by_email.file_number, by_email.company), ('NEW-1', 'Acme'))
+        self.assertEqual((by_phone.file_number, by_phone.company), ('NEW-2', 'Beta'))
+
+    def test_row_matching_two_contacts_is_rejected(self):
+        make_contact(email='grace@example.com')
+        make_contact(phone_number='+254722000001')
+        record = {**record('Ann', 'NEW-1', '+254722000001'),
+                  'email': 'grace@example.com'}
+        errors = ErrorCollector()
+        counts = ContactImporter(error_writer=errors).run([record])
+        self.assertEqual(counts['rejected'], 1)
+        self.assertEqual(errors.rows, [[1, 'phone_number belongs to another existing contact']])
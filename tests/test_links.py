@@ -0,0 +1,64 @@
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from contacts.links import add_links
+from contacts.models import Contact
+from contacts.stats import get_relationship_stats
+
+from .utils import make_contact
+
+
+class LinkCounterTests(TestCase):
+    def test_add_links_refreshes_counters(self):
+        file, client = make_contact(), make_contact()
+        add_links([(file.pk, client.pk)])
+        self.assertEqual(
+            Contact.objects.values_list('linked_clients_count', 'linked_files_count').get(pk=file.pk),
+            (1, 0)
+        )
+        self.assertEqual(
+            Contact.objects.values_list('linked_clients_count', 'linked_files_count').get(pk=client.pk),
+            (0, 1)
+        )
+
+    def test_save_does_not_write_stale_counters(self):
+        file, client = make_contact(), make_contact()
+        stale = Contact.objects.get(pk=file.pk)
+        add_links([(file.pk, client.pk)])
+
+        stale.company = 'Acme'
+        stale.save()
+
+        file.refresh_from_db()
+        self.assertEqual(file.company, 'Acme')
+        self.assertEqual(file.linked_clients_count, 1)
+
+    def test_save_keeps_deferred_fields_deferred(self):
+        contact = Contact.objects.only('id', 'company').get(pk=make_contact().pk)
+        contact.company = 'Acme'
+        contact.save()
+        self.assertIn('email', contact.get_deferred_fields())
+        self.assertEqual(Contact.objects.get(pk=contact.pk).company, 'Acme')
+
+    def test_save_reinserts_a_deleted_row(self):
+        contact = make_contact()
+        Contact.objects.filter(pk=contact.pk).delete()
+        contact.save()
+        self.assertTrue(Contact.objects.filter(pk=contact.pk).exists())
+
+
+class ReconcileLinkCountsTests(TestCase):
+    def test_repairs_counters_and_the_snapshot(self):
+        file, client = make_contact(), make_contact()
+        add_links([(file.pk, client.pk)])
+        Contact.objects.update(linked_clients_count=0, linked_files_count=0)
+        get_relationship_stats()
+
+        call_command('reconcile_link_counts', stdout=io.StringIO())
+
+        file.refresh_from_db()
+        self.assertEqual(file.linked_clients_count, 1)
+        stats = get_relationship_stats()
+        self.assertEqual((stats.linked_contacts, stats.contacts_with_links), (1, 2))
@@ -0,0 +1,36 @@
+from django.test import TestCase
+
+from contacts.links import add_links
+from contacts.network import contact_network
+
+from .utils import make_contact
+
+
+class NetworkTests(TestCase):
+    def setUp(self):
+        # A ring of six contacts, each linking the next one and the one
+        # after, so most contacts are reachable along several paths
+        self.contacts = [make_contact() for _ in range(6)]
+        ids = [contact.pk for contact in self.contacts]
+        add_links(
+            (ids[i], ids[(i + step) % len(ids)]) for i in range(len(ids)) for step in (1, 2)
+        )
+        self.ids = ids
+
+    def test_nodes_are_reached_once_at_their_shortest_distance(self):
+        network = contact_network(self.ids[0], depth=5, direction='clients')
+        depths = {node['id']: node['depth'] for node in network['nodes']}
+        self.assertEqual(len(network['nodes']), 6)
+        self.assertEqual(
+            depths,
+            {self.ids[0]: 0, self.ids[1]: 1, self.ids[2]: 1, self.ids[3]: 2, self.ids[4]: 2, self.ids[5]: 3}
+        )
+        self.assertFalse(network['truncated'])
+        self.assertIn([self.ids[0], self.ids[1]], network['edges'])
+
+    def test_walk_stops_at_max_nodes(self):
+        # The walk, the node details and the edges
+        with self.assertNumQueries(3):
+            network = contact_network(self.ids[0], depth=5, direction='both', max_nodes=3)
+        self.assertEqual([node['depth'] for node in network['nodes']], [0, 1, 1])
+        self.assertTrue(network['truncated'])
@@ -0,0 +1,46 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+from psycopg2 import extensions
+
+from addressbook.db.backends.pooled_postgresql import pool as pool_module
+from addressbook.db.backends.pooled_postgresql.pool import ConnectionPool, PoolTimeout, get_pool
+
+
+class FakeConnection:
+    closed = False
+    autocommit = True
+
+    def get_transaction_status(self):
+        return extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = True
+
+
+class PoolTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(pool_module, '_pools', {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_pools_are_keyed_by_connection_params(self):
+        params = {'database': 'addressbook', 'host': 'db', 'port': 5432, 'user': 'app'}
+        pool = get_pool('default', {}, params)
+        self.assertIs(get_pool('default', {}, dict(params)), pool)
+        self.assertIsNot(get_pool('default', {}, {**params, 'database': 'test_addressbook'}), pool)
+        with mock.patch('os.getpid', return_value=-1):
+            self.assertIsNot(get_pool('default', {}, params), pool)
+
+    def test_checkouts_are_bounded_and_connections_reused(self):
+        pool = ConnectionPool(max_size=2, timeout=0.01)
+        first = pool.getconn(FakeConnection)
+        second = pool.getconn(FakeConnection)
+        with self.assertRaises(PoolTimeout):
+            pool.getconn(FakeConnection)
+
+        pool.putconn(first)
+        self.assertIs(pool.getconn(FakeConnection), first)
+        stats = pool.stats()
+        self.assertEqual((stats['size'], stats['connections_created'], stats['timeouts']), (2, 2, 1))
+        self.assertIsNot(second, first)
@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+
+from contacts.stats import refresh_relationship_stats
+
+from .utils import APITestCase, make_contact
+
+
+@override_settings(INSTRUMENTATION={
+    **settings.INSTRUMENTATION, 'ENABLED': True, 'EXPOSE_HEADERS': True, 'STRICT_BUDGETS': True,
+})
+class QueryBudgetTests(APITestCase):
+    """
+    Every view with a query_budget stays within it, anonymously and with
+    session authentication; over budget, the middleware raises
+    QueryBudgetExceeded.
+    """
+    def setUp(self):
+        super().setUp()
+        file, client = make_contact(), make_contact()
+        file.linked_clients.add(client)
+        refresh_relationship_stats()
+        depth = settings.CONTACT_NETWORK['MAX_DEPTH']
+        self.paths = [
+            '/api/contacts/',
+            f'/api/contacts/{file.pk}/',
+            f'/api/contacts/{file.pk}/linked-clients/',
+            f'/api/contacts/{client.pk}/linked-files/',
+            f'/api/contacts/{file.pk}/network/?depth={depth}',
+            '/api/contacts/suggest/?q=First',
+            f'/api/contacts/lookup/?phone={file.phone_number}',
+            '/api/contacts/relationship-report/',
+            '/reports/links/',
+        ]
+
+    def assert_within_budgets(self):
+        for path in self.paths:
+            with self.subTest(path=path):
+                response = self.client.get(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertLessEqual(
+                    int(response['X-Query-Count']), int(response['X-Query-Budget'])
+                )
+
+    def test_anonymous(self):
+        self.assert_within_budgets()
+
+    def test_session_authenticated(self):
+        user = get_user_model().objects.create_user('budget', password='secret')
+        self.client.force_login(user)
+        self.assert_within_budgets()
+
+
+@override_settings(DEBUG=False, INSTRUMENTATION={
+    **settings.INSTRUMENTATION, 'ENABLED': True, 'EXPOSE_HEADERS': False,
+})
+class InstrumentationHeaderTests(APITestCase):
+    def test_headers_are_only_sent_to_staff(self):
+        make_contact()
+        response = self.client.get('/api/contacts/')
+        self.assertFalse(response.has_header('X-Query-Count'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+        staff = get_user_model().objects.create_user('staff', password='secret', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get('/api/contacts/')
+        self.assertTrue(response.has_header('X-Query-Count'))
@@ -0,0 +1,30 @@
+from api.caching import get_cache_stats
+
+from .utils import APITestCase, make_contact
+
+
+class RepresentationCacheTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.contact = make_contact()
+        self.url = f'/api/contacts/{self.contact.pk}/'
+
+    def test_second_read_is_a_hit(self):
+        first = self.client.get(self.url).json()
+        second = self.client.get(self.url).json()
+        self.assertEqual(first, second)
+        stats = get_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_save_drops_the_cached_representation(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.contact.company = 'Acme'
+            self.contact.save()
+        self.assertEqual(self.client.get(self.url).json()['company'], 'Acme')
+
+    def test_sparse_fieldsets_bypass_the_cache(self):
+        response = self.client.get(self.url, {'fields': 'id,first_name'})
+        self.assertEqual(set(response.json()), {'id', 'first_name'})
+        stats = get_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (0, 0))
@@ -0,0 +1,81 @@
+import time
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from addressbook.routers import (
+    STICKY_COOKIE, ReplicaRouter, ReplicaStickinessMiddleware, health, reads_may_be_stale, replica_reads
+)
+from contacts.models import Contact
+
+ROUTING = {**settings.REPLICA_ROUTING, 'ALIASES': ['replica_1']}
+
+
+@override_settings(REPLICA_ROUTING=ROUTING)
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(health, 'usable', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def read_alias(self, request, write=False):
+        @replica_reads
+        def view(request):
+            if write:
+                self.router.db_for_write(Contact)
+            return self.router.db_for_read(Contact)
+        return view(request)
+
+    def test_get_reads_go_to_a_replica(self):
+        self.assertEqual(self.read_alias(self.factory.get('/')), 'replica_1')
+        # Outside a marked view everything stays on the primary
+        self.assertIsNone(self.router.db_for_read(Contact))
+
+    def test_reads_follow_a_write_to_the_primary(self):
+        self.assertIsNone(self.read_alias(self.factory.get('/'), write=True))
+
+    def test_writes_and_sticky_clients_use_the_primary(self):
+        self.assertIsNone(self.read_alias(self.factory.post('/')))
+        request = self.factory.get('/')
+        request.COOKIES[STICKY_COOKIE] = str(time.time() + 60)
+        self.assertIsNone(self.read_alias(request))
+
+    def test_async_views_are_routed(self):
+        @replica_reads
+        async def view(request):
+            return self.router.db_for_read(Contact)
+        self.assertEqual(async_to_sync(view)(self.factory.get('/')), 'replica_1')
+
+    def test_unhealthy_replica_falls_back_to_the_primary(self):
+        health.usable.return_value = False
+        self.assertIsNone(self.read_alias(self.factory.get('/')))
+
+    def test_reads_may_be_stale_right_after_a_change(self):
+        @replica_reads
+        def view(request):
+            return reads_may_be_stale()
+
+        recent = datetime.now(timezone.utc)
+        with mock.patch('contacts.cache.get_contacts_changed_at', return_value=recent):
+            self.assertTrue(view(self.factory.get('/')))
+        old = recent - timedelta(seconds=ROUTING['MAX_LAG_SECONDS'] + 1)
+        with mock.patch('contacts.cache.get_contacts_changed_at', return_value=old):
+            self.assertFalse(view(self.factory.get('/')))
+        # An unknown change time (flushed cache) is not treated as stale
+        with mock.patch('contacts.cache.get_contacts_changed_at', return_value=None):
+            self.assertFalse(view(self.factory.get('/')))
+
+    def test_write_requests_set_the_sticky_cookie(self):
+        middleware = ReplicaStickinessMiddleware(lambda request: HttpResponse())
+        self.assertIn(STICKY_COOKIE, middleware(self.factory.post('/')).cookies)
+        self.assertNotIn(STICKY_COOKIE, middleware(self.factory.get('/')).cookies)
+
+    def test_replicas_are_never_migrated(self):
+        self.assertFalse(self.router.allow_migrate('replica_1', 'contacts'))
+        self.assertIsNone(self.router.allow_migrate('default', 'contacts'))
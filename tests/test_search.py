@@ -0,0 +1,16 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from contacts.search import get_backend_name
+
+
+class SearchBackendTests(SimpleTestCase):
+    def test_unknown_names_fall_back_to_the_default(self):
+        with override_settings(CONTACT_SEARCH={'BACKEND': 'fulltext'}):
+            self.assertEqual(get_backend_name('nope'), 'fulltext')
+            self.assertEqual(get_backend_name('trigram'), 'trigram')
+
+    def test_unknown_default_is_improperly_configured(self):
+        with override_settings(CONTACT_SEARCH={'BACKEND': 'elastic'}):
+            with self.assertRaisesMessage(ImproperlyConfigured, 'fulltext, icontains, trigram'):
+                get_backend_name()
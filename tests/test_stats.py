@@ -0,0 +1,34 @@
+from django.test import TestCase
+
+from contacts.links import add_links
+from contacts.models import RelationshipStatsDelta
+from contacts.stats import fold_stats_deltas, get_relationship_stats
+
+from .utils import make_contact
+
+
+class StatsDeltaTests(TestCase):
+    def test_writers_append_deltas_and_fold_applies_them(self):
+        file = make_contact()
+        stats = get_relationship_stats()
+        self.assertEqual(RelationshipStatsDelta.objects.count(), 0)
+
+        client = make_contact()
+        add_links([(file.pk, client.pk)])
+        self.assertTrue(RelationshipStatsDelta.objects.exists())
+        # The snapshot row is not written by the writers
+        self.assertEqual(get_relationship_stats().as_of, stats.as_of)
+
+        self.assertGreater(fold_stats_deltas(), 0)
+        self.assertEqual(RelationshipStatsDelta.objects.count(), 0)
+        stats = get_relationship_stats()
+        self.assertEqual(stats.total_contacts, 2)
+        self.assertEqual(stats.linked_contacts, 1)
+        self.assertEqual(stats.contacts_with_links, 2)
+        self.assertEqual([entry['id'] for entry in stats.top_files], [file.pk])
+
+    def test_fold_without_deltas_keeps_snapshot(self):
+        make_contact()
+        stats = get_relationship_stats()
+        self.assertEqual(fold_stats_deltas(), 0)
+        self.assertEqual(get_relationship_stats().as_of, stats.as_of)
@@ -0,0 +1,52 @@
+import itertools
+
+from django.core.cache import caches
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from contacts.models import Contact
+
+_sequence = itertools.count(1)
+
+
+def make_contact(**fields):
+    """Create a contact with unique phone number, email and file number"""
+    n = next(_sequence)
+    values = {
+        'first_name': f'First{n}',
+        'last_name': f'Last{n}',
+        'phone_number': f'+2547{n:08d}',
+        'email': f'contact{n}@example.com',
+        'address': f'{n} Test Street',
+        'file_number': f'T-{n:06d}',
+    }
+    values.update(fields)
+    return Contact.objects.create(**values)
+
+
+class _APIClientMixin:
+    client_class = APIClient
+
+    def setUp(self):
+        super().setUp()
+        for cache in caches.all():
+            cache.clear()
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class APITestCase(_APIClientMixin, TestCase):
+    """
+    TestCase against the configured Postgres database with a DRF client.
+
+    Caches are cleared before each test so cached search results, tokens
+    and throttle counters do not leak between tests.
+    """
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class APITransactionTestCase(_APIClientMixin, TransactionTestCase):
+    """
+    APITestCase with committed data, for the async views: their thread
+    pool hops use their own connections, which cannot see the data of a
+    TestCase's open transaction.
+    """